@@ -9,6 +9,15 @@ from maa.agent.agent_server import AgentServer
 from custom.action.Count import Count
 from custom.action.ScreenShot import ScreenShot,CheckResolution
 from custom.action.Node import DisableNode,NodeOverride
+from custom.action.FrameRecorder import FlushFrames
+from custom.action.DirtyRegion import SkipIfUnchanged
+from custom.recognition.WhereAmI import WhereAmI
+from custom.recognition.MultiTemplate import MultiTemplate
+from custom.recognition.ParallelAny import ParallelAny
+from custom.recognition.CachedRecognition import CachedRecognition
+from custom.sink.FrameRecorder import FrameRecorderContextSink,FrameRecorderTaskerSink
+from custom.sink.RecognitionTrace import RecognitionTraceSink
+from custom.sink.RecognitionCache import RecognitionCacheTaskerSink
 
 
 
@@ -32,4 +41,46 @@ class Agent_ScreenShot(ScreenShot):
 
 @AgentServer.custom_action("CheckResolution")
 class Agent_CheckResolution(CheckResolution):
+    pass
+
+@AgentServer.custom_action("FlushFrames")
+class Agent_FlushFrames(FlushFrames):
+    pass
+
+@AgentServer.custom_action("SkipIfUnchanged")
+class Agent_SkipIfUnchanged(SkipIfUnchanged):
+    pass
+
+
+@AgentServer.custom_recognition("WhereAmI")
+class Agent_WhereAmI(WhereAmI):
+    pass
+
+@AgentServer.custom_recognition("MultiTemplate")
+class Agent_MultiTemplate(MultiTemplate):
+    pass
+
+@AgentServer.custom_recognition("ParallelAny")
+class Agent_ParallelAny(ParallelAny):
+    pass
+
+@AgentServer.custom_recognition("CachedRecognition")
+class Agent_CachedRecognition(CachedRecognition):
+    pass
+
+
+@AgentServer.context_sink()
+class Agent_FrameRecorderContextSink(FrameRecorderContextSink):
+    pass
+
+@AgentServer.tasker_sink()
+class Agent_FrameRecorderTaskerSink(FrameRecorderTaskerSink):
+    pass
+
+@AgentServer.context_sink()
+class Agent_RecognitionTraceSink(RecognitionTraceSink):
+    pass
+
+@AgentServer.tasker_sink()
+class Agent_RecognitionCacheTaskerSink(RecognitionCacheTaskerSink):
     pass
\ No newline at end of file
@@ -4,14 +4,19 @@
 用于在流水线中记录计数并根据计数结果分支执行不同节点
 （达标走 next_node，未达标走 else_node）。
 重置目标节点的count
-播报当前运行次数
+播报当前运行次数及循环吞吐统计（每小时次数、单次耗时、预计剩余时间）
+计数保存在进程内的 counter_store 中，仅在 sync 开启时写回流水线
+开启 checkpoint 时计数写入断点日志，意外退出后同一任务入口再次运行时恢复
 """
 
 
 from maa.context import Context
 from maa.custom_action import CustomAction
-import json
 from utils.logger import logger
+from utils.action_param import NODES, parse_param
+from utils.counter_store import counter_store
+from utils.loop_stats import loop_stats
+from utils.count_checkpoint import count_checkpoint
 
 
 class Count(CustomAction):
@@ -19,9 +24,20 @@ class Count(CustomAction):
     动作主入口。
     读取 argv.custom_action_param（JSON）
     根据 count 与 target_count 决定走哪一组后续节点（next_node 或 else_node）
-    并把更新后的状态写回流水线。
+    并把更新后的状态记录到 counter_store。
     """
 
+    PARAM_SPEC = {
+        "count": (int, 0),
+        "target_count": (int, 0),
+        "next_node": (NODES, ()),
+        "else_node": (NODES, ()),
+        "reset_node": (NODES, ()),
+        "logger": (bool, False),
+        "sync": (bool, False),
+        "checkpoint": (bool, False),
+    }
+
     def run(
         self, context: Context, argv: CustomAction.RunArg
     ) -> CustomAction.RunResult:
@@ -34,61 +50,100 @@ class Count(CustomAction):
                 "next_node": ["node1", "node2"],
                 "else_node": ["node3"],
                 "reset_node": ["node4"],
-                "logger":False
+                "logger":False,
+                "sync": False,
+                "checkpoint": False
             }
-        count: 当前次数
+        count: 初始次数（该任务首次运行此节点时读取，之后以内存中的计数为准）
         target_count: 目标次数
         next_node: 达到目标次数后执行的节点. 支持多个节点，按顺序执行，可以出现重复节点，可以为空
         else_node: 未达到目标次数时执行的节点. 支持多个节点，按顺序执行，可以出现重复节点，可以为空
         reset_node: 将指定节点的count重置为0，支持多个节点，可以为空
         logger：是否输出运行次数
+        sync: 是否把更新后的count写回流水线，其他节点需要读取count时开启
+        checkpoint: 是否把count写入 ./config 下的断点日志，重启后同一任务入口继续计数
         """
 
-        argv_dict: dict = json.loads(argv.custom_action_param)
-        # print(argv.node_name,argv_dict)
+        argv_dict = parse_param(argv, self.PARAM_SPEC, "Count")
+        if argv_dict is None:
+            return CustomAction.RunResult(success=False)
         if not argv_dict:
             return CustomAction.RunResult(success=True)
 
-        current_count = argv_dict.get("count", 0)
-        target_count = argv_dict.get("target_count", 0)
-        next_node = argv_dict.get("next_node", [])
-        else_node = argv_dict.get("else_node", [])
-        reset_node = argv_dict.get("reset_node", [])
-        logger_flag = argv_dict.get("logger", False)
+        task_id = argv.task_detail.task_id
+        entry = argv.task_detail.entry
+        checkpoint_flag = argv_dict["checkpoint"]
+
+        initial_count = argv_dict["count"]
+        if checkpoint_flag and not counter_store.has(task_id, argv.node_name):
+            restored_count = count_checkpoint.get(entry, argv.node_name)
+            if restored_count is not None:
+                initial_count = restored_count
+                logger.info(f"{argv.node_name}从断点恢复计数: {restored_count}")
+        current_count = counter_store.get(task_id, argv.node_name, initial_count)
+        target_count = argv_dict["target_count"]
+        next_node = argv_dict["next_node"]
+        else_node = argv_dict["else_node"]
+        reset_node = argv_dict["reset_node"]
+        logger_flag = argv_dict["logger"]
+        sync_flag = argv_dict["sync"]
 
         # 重设reset_node的count为0
         if reset_node:
-            self._reset_nodes(context=context, nodes=reset_node, reset_count=0)
+            self._reset_nodes(task_id=task_id, nodes=reset_node, reset_count=0)
+            if checkpoint_flag:
+                for node in reset_node:
+                    count_checkpoint.record(entry, node, 0)
+            if sync_flag:
+                counter_store.sync_to_pipeline(context, task_id, reset_node)
 
         # target_count=0时，action运行else_node
         # 使得option修改target_count逻辑相同
         if current_count < target_count or target_count == 0:
             current_count = current_count + 1
             self._reset_nodes(
-                context=context, nodes=argv.node_name, reset_count=current_count
+                task_id=task_id, nodes=argv.node_name, reset_count=current_count
             )
+            loop_stats.tick(task_id, argv.node_name)
+            if checkpoint_flag:
+                count_checkpoint.record(entry, argv.node_name, current_count)
+            if sync_flag:
+                counter_store.sync_to_pipeline(context, task_id, [argv.node_name])
 
             # 运行播报
             if logger_flag:
                 if self._magnitude(current_count):
+                    stats_text = self._stats_text(
+                        task_id, argv.node_name, current_count, target_count
+                    )
                     if target_count == 0:
-                        logger.info(f"当前运行次数为{current_count}, 无限循环中...")
+                        logger.info(
+                            f"当前运行次数为{current_count}, 无限循环中...{stats_text}"
+                        )
                     else:
                         logger.info(
-                            f"当前运行次数为{current_count}, 目标次数为{target_count}"
+                            f"当前运行次数为{current_count}, 目标次数为{target_count}{stats_text}"
                         )
 
             self._run_nodes(context, else_node)
 
         else:
-            self._reset_nodes(context=context, nodes=argv.node_name, reset_count=0)
+            # 重置前取出本轮统计用于播报
+            stats_text = self._stats_text(
+                task_id, argv.node_name, current_count, target_count
+            )
+            self._reset_nodes(task_id=task_id, nodes=argv.node_name, reset_count=0)
+            if checkpoint_flag:
+                count_checkpoint.record(entry, argv.node_name, 0)
+            if sync_flag:
+                counter_store.sync_to_pipeline(context, task_id, [argv.node_name])
 
             # 运行播报
             if logger_flag:
                 logger.info(
-                    f"{argv.node_name}已达到目标次数{target_count}，执行后续节点{next_node}"
+                    f"{argv.node_name}已达到目标次数{target_count}，执行后续节点{list(next_node)}{stats_text}"
                 )
-            self._run_nodes(context, argv_dict.get("next_node"))
+            self._run_nodes(context, next_node)
 
         return CustomAction.RunResult(success=True)
 
@@ -101,42 +156,25 @@ class Count(CustomAction):
         for node in nodes:
             context.run_task(node)
 
-    def _reset_nodes(self, context: Context, nodes: str | list, reset_count: int):
-        """重设节点的count为reset_count"""
+    def _reset_nodes(self, task_id: int, nodes: str | list | tuple, reset_count: int):
+        """重设节点的count为reset_count（仅修改内存中的计数）"""
         if not nodes:
             return
         if isinstance(nodes, str):
             nodes = [nodes]
-        for node in nodes:
-            # 获取node信息
-            node_data = context.get_node_data(node)
-            # get_node_data返回值为node_data:{"action":{"param":{"custom_action_param"}}}
-            node_action_param = node_data.get("action", {}).get("param", {})
-            if (
-                not node_action_param.get("custom_action", "")
-            ) or node_action_param.get("custom_action", "") != "Count":
-                return
-
-            node_custom_action_param = node_action_param.get("custom_action_param", {})
-            if not node_custom_action_param:
-                return
-
-            # 直接修改node_custom_action_param防止漏掉或新增参数
-            node_custom_action_param["count"] = reset_count
-
-            context.override_pipeline(
-                {node: {"custom_action_param": node_custom_action_param}}
-            )
-            if reset_count == 0:
+        counter_store.reset(task_id, nodes, reset_count)
+        if reset_count == 0:
+            loop_stats.reset(task_id, nodes)
+            for node in nodes:
                 print(f'"{node}"节点已重置count为{reset_count}！')
 
-            # node_custom_action_param_check = (
-            #     context.get_node_data(node)
-            #     .get("action", {})
-            #     .get("param", {})
-            #     .get("custom_action_param", {})
-            # )
-            # print(f"重设节点{node}内容检查为{node_custom_action_param_check}")
+    def _stats_text(
+        self, task_id: int, node: str, current_count: int, target_count: int
+    ) -> str:
+        """播报用的循环统计文本，数据不足时为空"""
+        summary = loop_stats.summary(task_id, node, current_count, target_count)
+        text = loop_stats.format_summary(summary)
+        return f"（{text}）" if text else ""
 
     def _magnitude(self, count: int) -> bool:
         """
@@ -0,0 +1,66 @@
+"""
+该文件的作用为：
+提供 SkipIfUnchanged 动作，判断 ROI 自上次经过该节点后画面是否变化，
+分别执行 changed_node 或 unchanged_node，用于在静止画面上跳过开销较大的识别节点。
+"""
+
+from maa.context import Context
+from maa.custom_action import CustomAction
+from utils.logger import logger
+from utils.action_param import NODES, REQUIRED, parse_param
+from utils.dirty_region import dirty_regions
+
+
+class SkipIfUnchanged(CustomAction):
+    """
+    ROI 变化门控。
+
+    参数格式:
+    {
+        "roi": [830, 590, 450, 130],
+        "key": "放弃挑战",
+        "changed_node": ["放弃挑战"],
+        "unchanged_node": []
+    }
+    roi: 要检查的区域 [x, y, w, h]，w/h 为 0 表示整个画面
+    key: 记录结论所用的名称，默认为当前节点名；多个节点共享结论时填写相同的 key
+    changed_node: ROI 变化（或首次运行）时执行的节点，可以为空
+    unchanged_node: ROI 未变化时执行的节点，可以为空
+    """
+
+    PARAM_SPEC = {
+        "roi": (list, REQUIRED),
+        "key": (str, ""),
+        "changed_node": (NODES, ()),
+        "unchanged_node": (NODES, ()),
+    }
+
+    def run(
+        self,
+        context: Context,
+        argv: CustomAction.RunArg,
+    ) -> CustomAction.RunResult:
+
+        params = parse_param(argv, self.PARAM_SPEC, "SkipIfUnchanged")
+        if not params:
+            return CustomAction.RunResult(success=False)
+
+        roi = params["roi"]
+        if len(roi) != 4 or not all(isinstance(value, int) for value in roi):
+            logger.error(f"SkipIfUnchanged 参数 roi 应为 [x, y, w, h]，实际为 {roi!r}")
+            return CustomAction.RunResult(success=False)
+
+        key = params["key"] or argv.node_name
+        dirty_regions.update(context.tasker.controller.cached_image)
+        unchanged, _ = dirty_regions.lookup(key, roi)
+        dirty_regions.remember(key, roi, True)
+
+        if unchanged:
+            logger.debug(f"{key} 区域 {roi} 未变化，执行 {list(params['unchanged_node'])}")
+            nodes = params["unchanged_node"]
+        else:
+            nodes = params["changed_node"]
+
+        for node in nodes:
+            context.run_task(node)
+        return CustomAction.RunResult(success=True)
@@ -0,0 +1,37 @@
+"""
+该文件的作用为：
+提供 FlushFrames 动作，把故障帧缓冲区中最近的画面写入磁盘。
+放在节点的 on_error 中即可在出错时保留出错前的画面。
+"""
+
+from maa.context import Context
+from maa.custom_action import CustomAction
+from utils.action_param import parse_param
+from utils.frame_recorder import frame_recorder
+
+
+class FlushFrames(CustomAction):
+    """
+    保存故障帧缓冲区。
+
+    参数格式:
+    {
+        "reason": "on_error"
+    }
+    reason: 写入目录名中的原因，默认 on_error
+    """
+
+    PARAM_SPEC = {"reason": (str, "on_error")}
+
+    def run(
+        self,
+        context: Context,
+        argv: CustomAction.RunArg,
+    ) -> CustomAction.RunResult:
+
+        params = parse_param(argv, self.PARAM_SPEC, "FlushFrames")
+        if params is None:
+            return CustomAction.RunResult(success=False)
+
+        frame_recorder.flush(params.get("reason", "on_error"), argv.node_name)
+        return CustomAction.RunResult(success=True)
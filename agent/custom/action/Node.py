@@ -1,10 +1,11 @@
 
-import json
 from maa.agent.agent_server import AgentServer
 from maa.custom_action import CustomAction
 from maa.context import Context
 
-from utils import logger
+from utils.logger import logger
+from utils.action_param import NODES, REQUIRED, parse_param
+from utils.override_batch import OverrideBatch
 
 class DisableNode(CustomAction):
     """
@@ -14,17 +15,24 @@ class DisableNode(CustomAction):
     {
         "node_name": "结点名称"
     }
+    node_name 也可以是结点名称列表，所有结点合并为一次覆盖。
     """
 
+    PARAM_SPEC = {"node_name": (NODES, REQUIRED)}
+
     def run(
         self,
         context: Context,
         argv: CustomAction.RunArg,
     ) -> CustomAction.RunResult:
 
-        node_name = json.loads(argv.custom_action_param)["node_name"]
+        params = parse_param(argv, self.PARAM_SPEC, "DisableNode")
+        if not params:
+            return CustomAction.RunResult(success=False)
 
-        context.override_pipeline({f"{node_name}": {"enabled": False}})
+        with OverrideBatch(context, "DisableNode") as batch:
+            for node in params["node_name"]:
+                batch.add(node, {"enabled": False})
 
         return CustomAction.RunResult(success=True)
 
@@ -46,14 +54,17 @@ class NodeOverride(CustomAction):
         argv: CustomAction.RunArg,
     ) -> CustomAction.RunResult:
 
-        ppover = json.loads(argv.custom_action_param)
+        ppover = parse_param(argv, action="NodeOverride")
+        if ppover is None:
+            return CustomAction.RunResult(success=False)
 
         if not ppover:
             logger.warning("No ppover")
             return CustomAction.RunResult(success=True)
 
-        logger.debug(f"NodeOverride: {ppover}")
-        context.override_pipeline(ppover)
+        logger.debug(f"NodeOverride: {dict(ppover)}")
+        with OverrideBatch(context, "NodeOverride") as batch:
+            batch.add_many(dict(ppover))
 
         return CustomAction.RunResult(success=True)
 
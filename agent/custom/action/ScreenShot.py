@@ -1,15 +1,33 @@
 """
 该文件的作用为：
-截取当前屏幕并保存为 PNG 文件，文件名包含截图类型和时间戳。截图文件保存在 "debug" 目录中，且会定期清理三天前的旧截图文件。
+截取当前屏幕并保存为 PNG（或 WebP、NumPy 原始数组）文件，文件名包含截图类型和时间戳。截图文件保存在 "debug" 目录中，
+保存后清理超过 max_age_days（默认三天）的旧截图，并将目录总大小限制在 max_total_mb 以内。
+编码、写入与清理默认在后台线程中完成，动作交出图像后立即返回。
+开启 dedup 时，与上一张已保存截图几乎相同的画面会被跳过或以硬链接代替。
 """
 
 import os
-import json
 from maa.context import Context
 from maa.custom_action import CustomAction
 from datetime import datetime
-from PIL import Image
-from utils import logger
+from utils.logger import logger
+from utils.action_param import REQUIRED, ParamError, parse_param
+from utils.screenshot_writer import (
+    BLOCK,
+    COMPRESSION_RANGES,
+    DROP,
+    IMAGE_FORMATS,
+    save_image,
+    screenshot_writer,
+)
+from utils.screenshot_retention import screenshot_retention
+from utils.frame_hash import dhash, hamming_distance
+from utils.template_cache import template_cache
+
+# save_dir -> (上一张已保存截图的哈希, 路径)
+_last_saved: dict[str, tuple[int, str]] = {}
+# save_dir -> 累计去重次数
+_dedup_count: dict[str, int] = {}
 
 
 class ScreenShot(CustomAction):
@@ -18,16 +36,48 @@ class ScreenShot(CustomAction):
 
     参数格式:
     {
-        "save_dir": "保存截图的目录路径"
+        "save_dir": "保存截图的目录路径",
+        "format": "png",
+        "compression": 6,
+        "async": true,
+        "queue_policy": "block",
+        "max_age_days": 3,
+        "max_total_mb": 1024,
+        "dedup": "off",
+        "dedup_distance": 4
     }
+    format: 保存格式，png / webp（无损）/ npy（原始 BGR 数组，最快，需离线转换）
+    compression: 压缩等级，png 为 0-9，webp 为 0-6，越小越快；不填使用默认值，npy 忽略该参数
+    async: 是否在后台线程中编码保存，默认开启
+    queue_policy: 后台写入队列已满时的策略，block 等待空位，drop 丢弃本次截图
+    max_age_days: 截图最长保留天数，0 表示不限制
+    max_total_mb: 截图目录总大小上限（MB），超出时删除最旧的截图，0 表示不限制
+    dedup: 画面与上一张已保存截图几乎相同时的处理，off 照常保存，skip 跳过，link 硬链接到上一张
+    dedup_distance: 判定为相同画面的最大哈希距离（0-64），越小越严格
     """
 
+    PARAM_SPEC = {
+        "save_dir": (str, REQUIRED),
+        "format": (str, "png", tuple(IMAGE_FORMATS)),
+        "compression": (int, None),
+        "async": (bool, True),
+        "queue_policy": (str, BLOCK, (BLOCK, DROP)),
+        "max_age_days": (float, 3.0),
+        "max_total_mb": (float, 1024.0),
+        "dedup": (str, "off", ("off", "skip", "link")),
+        "dedup_distance": (int, 4),
+    }
+
     def run(
         self,
         context: Context,
         argv: CustomAction.RunArg,
     ) -> CustomAction.RunResult:
 
+        params = parse_param(argv, self.PARAM_SPEC, "ScreenShot", self._check_params)
+        if not params:
+            return CustomAction.RunResult(success=False)
+
         # image array(BGR)
         screen_array = context.tasker.controller.cached_image
 
@@ -39,20 +89,68 @@ class ScreenShot(CustomAction):
         if abs(aspect_ratio - target_ratio) / target_ratio > 0.01:
             logger.error(f"当前模拟器分辨率不是16:9! 当前分辨率: {width}x{height}")
 
-        # BGR2RGB
-        if len(screen_array.shape) == 3 and screen_array.shape[2] == 3:
-            rgb_array = screen_array[:, :, ::-1]
-        else:
-            rgb_array = screen_array
+        if not (len(screen_array.shape) == 3 and screen_array.shape[2] == 3):
             logger.warning("当前截图并非三通道")
 
-        img = Image.fromarray(rgb_array)
+        save_dir = params["save_dir"]
+        fmt = params["format"]
+        save_path = f"{save_dir}/{self._get_format_timestamp(datetime.now())}.{fmt}"
+        encoding = {"fmt": fmt, "compression": params["compression"]}
+        retention = {
+            "max_age_days": params["max_age_days"],
+            "max_total_mb": params["max_total_mb"],
+        }
+
+        link_source = None
+        frame_hash = None
+        if params["dedup"] != "off":
+            duplicate_of, frame_hash = self._find_duplicate(
+                screen_array, save_dir, save_path, params["dedup_distance"]
+            )
+            if duplicate_of and params["dedup"] == "skip":
+                return CustomAction.RunResult(success=True)
+            link_source = duplicate_of
 
-        save_dir = json.loads(argv.custom_action_param)["save_dir"]
-        os.makedirs(save_dir, exist_ok=True)
-        now = datetime.now()
-        img.save(f"{save_dir}/{self._get_format_timestamp(now)}.png")
-        logger.info(f"截图保存至 {save_dir}/{self._get_format_timestamp(now)}.png")
+        if link_source:
+            if params["async"]:
+                screenshot_writer.submit(
+                    self._link,
+                    link_source,
+                    screen_array,
+                    save_dir,
+                    save_path,
+                    encoding,
+                    retention,
+                    frame_hash,
+                    policy=params["queue_policy"],
+                )
+            else:
+                self._link(
+                    link_source,
+                    screen_array,
+                    save_dir,
+                    save_path,
+                    encoding,
+                    retention,
+                    frame_hash,
+                )
+        elif params["async"]:
+            # cached_image 每次返回新的数组，交给写入线程后不再修改
+            screenshot_writer.submit(
+                self._save,
+                screen_array,
+                save_dir,
+                save_path,
+                encoding,
+                retention,
+                frame_hash,
+                policy=params["queue_policy"],
+            )
+        else:
+            save_image(screen_array, save_path, **encoding)
+            logger.info(f"截图保存至 {save_path}")
+            self._remember(save_dir, frame_hash, save_path)
+            screenshot_retention.track(save_dir, save_path, **retention)
 
         task_detail = context.tasker.get_task_detail(argv.task_detail.task_id)
         logger.debug(
@@ -61,6 +159,81 @@ class ScreenShot(CustomAction):
 
         return CustomAction.RunResult(success=True)
 
+    @staticmethod
+    def _check_params(params: dict):
+        """压缩等级需在所选格式的范围内，避免到写入线程中才失败；哈希距离需在 0-64 之间"""
+        if not 0 <= params["dedup_distance"] <= 64:
+            raise ParamError(f"dedup_distance 应为 0-64，实际为 {params['dedup_distance']}")
+
+        compression = params["compression"]
+        value_range = COMPRESSION_RANGES.get(params["format"])
+        if compression is None or value_range is None:
+            return
+        low, high = value_range
+        if not low <= compression <= high:
+            raise ParamError(
+                f"compression 在 {params['format']} 格式下应为 {low}-{high}，实际为 {compression}"
+            )
+
+    def _save(
+        self,
+        screen_array,
+        save_dir: str,
+        save_path: str,
+        encoding: dict,
+        retention: dict,
+        frame_hash: int | None = None,
+    ):
+        """在写入线程中保存截图并清理旧文件"""
+        save_image(screen_array, save_path, **encoding)
+        logger.info(f"截图保存至 {save_path}")
+        self._remember(save_dir, frame_hash, save_path)
+        screenshot_retention.track(save_dir, save_path, **retention)
+
+    def _find_duplicate(
+        self, screen_array, save_dir: str, save_path: str, max_distance: int
+    ) -> tuple[str | None, int]:
+        """
+        与该目录上一张已保存截图比较哈希，返回 (上一张的路径, 写入后应记录的哈希)。
+        画面不同时路径为 None；写入完成后才由 _remember 把本张记为最新。
+        """
+        frame_hash = dhash(screen_array)
+        last = _last_saved.get(save_dir)
+        if last and hamming_distance(frame_hash, last[0]) <= max_distance:
+            _dedup_count[save_dir] = _dedup_count.get(save_dir, 0) + 1
+            logger.info(
+                f"画面与上一张截图相同，去重 {save_path}（{save_dir} 累计 {_dedup_count[save_dir]} 次）"
+            )
+            # 沿用上一张的哈希，避免连续的小变化逐张累积
+            return last[1], last[0]
+        return None, frame_hash
+
+    @staticmethod
+    def _remember(save_dir: str, frame_hash: int | None, save_path: str):
+        """截图写入完成后记为该目录最新的截图；未开启 dedup 时不记录"""
+        if frame_hash is not None:
+            _last_saved[save_dir] = (frame_hash, save_path)
+
+    def _link(
+        self,
+        source: str,
+        screen_array,
+        save_dir: str,
+        save_path: str,
+        encoding: dict,
+        retention: dict,
+        frame_hash: int | None = None,
+    ):
+        """以硬链接保存重复画面，源文件不存在或不支持硬链接时照常保存"""
+        try:
+            os.link(source, save_path)
+            logger.debug(f"截图硬链接 {save_path} -> {source}")
+        except OSError:
+            save_image(screen_array, save_path, **encoding)
+            logger.info(f"截图保存至 {save_path}")
+        self._remember(save_dir, frame_hash, save_path)
+        screenshot_retention.track(save_dir, save_path, **retention)
+
     def _get_format_timestamp(self, now):
 
         date = now.strftime("%Y.%m.%d")
@@ -73,6 +246,7 @@ class ScreenShot(CustomAction):
 class CheckResolution(CustomAction):
     """
     检查当前模拟器分辨率是否符合预期（16:9）。
+    不符合时为识别画面的实际尺寸预先准备缩放后的模板，供自定义识别使用。
     """
 
     def run(
@@ -93,4 +267,11 @@ class CheckResolution(CustomAction):
         else:
             return CustomAction.RunResult(success=True)
         logger.info("建议调整至16:9（如1280x720）")
+
+        # 识别使用的是控制器缩放后的画面，按其尺寸缩放模板
+        image = context.tasker.controller.cached_image
+        if image is not None and image.size:
+            frame_size = (image.shape[1], image.shape[0])
+            if template_cache.prepare_async(frame_size):
+                logger.info(f"自定义识别将使用按 {frame_size[0]}x{frame_size[1]} 缩放的模板与 ROI")
         return CustomAction.RunResult(success=True)
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+该文件的作用为：
+提供 CachedRecognition 自定义识别，经 recognition_cache 执行指定节点的识别：
+节点 ROI 内画面逐像素相同、节点配置也未变化时直接返回上一次的结果，
+适合在 post_delay 间隔或等待界面时反复检查静止画面的节点。
+识别结果为被执行节点的结果，detail 为 {"node": 节点名}。
+"""
+
+import json
+
+from maa.context import Context
+from maa.custom_recognition import CustomRecognition
+from utils.action_param import REQUIRED, parse_param
+from utils.recognition_cache import recognition_cache
+
+
+class CachedRecognition(CustomRecognition):
+    """
+    带缓存的节点识别。
+
+    参数格式:
+    {
+        "node": "主页面-角色面板"
+    }
+    node: 要执行识别的节点名（其识别不应有点击等副作用）
+    """
+
+    PARAM_SPEC = {"node": (str, REQUIRED)}
+
+    def analyze(
+        self,
+        context: Context,
+        argv: CustomRecognition.AnalyzeArg,
+    ) -> CustomRecognition.AnalyzeResult:
+
+        params = parse_param(argv, self.PARAM_SPEC, "CachedRecognition")
+        if not params:
+            return CustomRecognition.AnalyzeResult(box=None, detail="参数错误")
+
+        node = params["node"]
+        reco_detail = recognition_cache.run(context, node, argv.image)
+        detail = json.dumps({"node": node}, ensure_ascii=False)
+        if reco_detail is None or not reco_detail.hit or reco_detail.box is None:
+            return CustomRecognition.AnalyzeResult(box=None, detail=detail)
+        box = reco_detail.box
+        return CustomRecognition.AnalyzeResult(box=(box.x, box.y, box.w, box.h), detail=detail)
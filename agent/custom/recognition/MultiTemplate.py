@@ -0,0 +1,113 @@
+"""
+该文件的作用为：
+提供 MultiTemplate 自定义识别，在一次调用中匹配多个模板。
+模板只解码一次并缓存在 template_cache 中，画面只裁剪一次（所有 ROI 的并集），
+各模板的得分在同一批频域运算中求出（灰度匹配，得分与原生 TemplateMatch 不同）。识别结果为得分最高的模板，
+detail 中附带每个模板的得分：{"best": 模板, "score": 得分, "scores": {模板: 得分}}。
+"""
+
+import json
+
+from maa.context import Context
+from maa.custom_recognition import CustomRecognition
+from utils.logger import logger
+from utils.action_param import NODES, REQUIRED, ParamError, parse_param
+from utils.template_cache import map_roi, template_cache, to_gray
+from utils.template_match import MatchRegion
+
+
+class MultiTemplate(CustomRecognition):
+    """
+    多模板匹配。
+
+    参数格式:
+    {
+        "template": ["战斗/角色/菲娜Q.png", "战斗/角色/赛琪Q.png", "战斗/角色/黎瑟Q.png"],
+        "roi": [850, 560, 100, 120],
+        "threshold": 0.7
+    }
+    template: 模板路径（相对 image 目录），可以是单个字符串或列表
+    roi: 识别区域 [x, y, w, h]（1280x720 坐标），所有模板共用；
+         也可以是与 template 等长的 ROI 列表，每个模板使用各自的区域；不填为整个画面
+    threshold: 得分阈值，最高得分不低于该值时识别成功
+    """
+
+    PARAM_SPEC = {
+        "template": (NODES, REQUIRED),
+        "roi": (list, []),
+        "threshold": (float, 0.7),
+    }
+
+    def analyze(
+        self,
+        context: Context,
+        argv: CustomRecognition.AnalyzeArg,
+    ) -> CustomRecognition.AnalyzeResult:
+
+        params = parse_param(argv, self.PARAM_SPEC, "MultiTemplate", self._check_template)
+        if not params:
+            return CustomRecognition.AnalyzeResult(box=None, detail="参数错误")
+
+        names = params["template"]
+        rois = self._rois(params["roi"], len(names))
+        if rois is None:
+            logger.error(
+                f"MultiTemplate 节点 {argv.node_name} 的 roi 应为 [x, y, w, h] 或与 template 等长的列表"
+            )
+            return CustomRecognition.AnalyzeResult(box=None, detail="参数错误")
+
+        image = argv.image
+        resolution = (image.shape[1], image.shape[0])
+        try:
+            templates = [template_cache.get(name, resolution, gray=True) for name in names]
+        except OSError as e:
+            logger.error(f"MultiTemplate 节点 {argv.node_name} 读取模板失败: {e}")
+            return CustomRecognition.AnalyzeResult(box=None, detail="模板不存在")
+
+        mapped = [
+            map_roi(roi, resolution) if roi else (0, 0, *resolution) for roi in rois
+        ]
+        left = min(x for x, _, _, _ in mapped)
+        top = min(y for _, y, _, _ in mapped)
+        right = max(x + w for x, _, w, _ in mapped)
+        bottom = max(y + h for _, y, _, h in mapped)
+
+        # 只裁剪一次，各模板在并集区域内按自己的 ROI 限定匹配范围
+        region = MatchRegion(to_gray(image[top:bottom, left:right]))
+        windows = [(x - left, y - top, w, h) for x, y, w, h in mapped]
+        results = region.best_many(templates, windows)
+
+        scores = {name: round(score, 4) for name, (score, _, _) in zip(names, results)}
+        best = max(range(len(names)), key=lambda index: results[index][0])
+        score, dx, dy = results[best]
+        hit = score >= params["threshold"]
+        detail = json.dumps(
+            {"best": names[best] if hit else None, "score": round(score, 4), "scores": scores},
+            ensure_ascii=False,
+        )
+        if not hit:
+            return CustomRecognition.AnalyzeResult(box=None, detail=detail)
+
+        template = templates[best]
+        box = (left + dx, top + dy, template.shape[1], template.shape[0])
+        return CustomRecognition.AnalyzeResult(box=box, detail=detail)
+
+    @staticmethod
+    def _check_template(params: dict):
+        """template 至少包含一个模板"""
+        if not params["template"]:
+            raise ParamError("template 不能为空")
+
+    def _rois(self, roi: list, count: int) -> list[list[int]] | None:
+        """把 roi 参数展开为每个模板一个 ROI，空列表表示整个画面"""
+        if not roi:
+            return [[]] * count
+        if len(roi) == 4 and all(isinstance(value, int) for value in roi):
+            return [roi] * count
+        if len(roi) == count and all(
+            isinstance(item, list)
+            and (not item or (len(item) == 4 and all(isinstance(v, int) for v in item)))
+            for item in roi
+        ):
+            return roi
+        return None
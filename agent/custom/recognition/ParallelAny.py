@@ -0,0 +1,57 @@
+"""
+该文件的作用为：
+提供 ParallelAny 自定义识别，并行执行多个子识别节点，作用与 Or 相同，
+适合各分支识别不同 ROI、互不依赖的情况。
+识别结果为命中分支的结果，detail 为 {"node": 命中节点, "elapsed_ms": 实际耗时, "saved_ms": 节省耗时}。
+"""
+
+import json
+
+from maa.context import Context
+from maa.custom_recognition import CustomRecognition
+from utils.logger import logger
+from utils.action_param import NODES, REQUIRED, parse_param
+from utils.parallel_recognition import FIRST, PRIORITY, parallel_recognizer
+
+
+class ParallelAny(CustomRecognition):
+    """
+    并行 Or 识别。
+
+    参数格式:
+    {
+        "any_of": ["主页面-角色面板", "返回上一级", "放弃挑战"],
+        "mode": "first",
+        "cache": true
+    }
+    any_of: 子识别节点名，顺序即优先级
+    mode: first 返回最先完成且命中的分支，priority 返回顺序最靠前的命中分支（与 Or 结果一致）
+    cache: 子识别是否使用识别结果缓存
+    """
+
+    PARAM_SPEC = {
+        "any_of": (NODES, REQUIRED),
+        "mode": (str, FIRST, (FIRST, PRIORITY)),
+        "cache": (bool, True),
+    }
+
+    def analyze(
+        self,
+        context: Context,
+        argv: CustomRecognition.AnalyzeArg,
+    ) -> CustomRecognition.AnalyzeResult:
+
+        params = parse_param(argv, self.PARAM_SPEC, "ParallelAny")
+        if not params:
+            return CustomRecognition.AnalyzeResult(box=None, detail="参数错误")
+
+        node, reco_detail, timing = parallel_recognizer.run(
+            context, argv.image, params["any_of"], params["mode"], params["cache"]
+        )
+        logger.debug(f"ParallelAny {argv.node_name}: 命中 {node}，{timing}")
+
+        detail = json.dumps({"node": node, **timing}, ensure_ascii=False)
+        if node is None:
+            return CustomRecognition.AnalyzeResult(box=None, detail=detail)
+        box = reco_detail.box
+        return CustomRecognition.AnalyzeResult(box=(box.x, box.y, box.w, box.h), detail=detail)
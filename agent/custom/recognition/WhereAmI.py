@@ -0,0 +1,66 @@
+"""
+该文件的作用为：
+提供 WhereAmI 自定义识别，一次调用得出当前页面（主页面、二级页面、弹窗、局内、委托结束），
+代替导航节点中重复的 Or 识别树（页面树为 page.json 中的"页面识别"节点，由一次原生识别执行）。
+识别结果的 detail 为 {"page": 页面, "score": 得分}。
+"""
+
+import json
+
+from maa.context import Context
+from maa.custom_recognition import CustomRecognition
+from utils.logger import logger
+from utils.action_param import NODES, parse_param
+from utils.page_classifier import PAGES, page_classifier
+
+
+class WhereAmI(CustomRecognition):
+    """
+    页面识别。
+
+    参数格式:
+    {
+        "expected": ["主页面", "二级页面"],
+        "threshold": 0.7,
+        "ocr_expected": ["放弃挑战", "放弃"]
+    }
+    expected: 期望的页面，当前页面属于其中之一时识别成功；为空时识别到任意页面即成功
+    threshold: TemplateMatch 阈值
+    ocr_expected: 委托结束页面 OCR 兜底的期望文字，不填为 ["放弃挑战", "放弃"]
+    """
+
+    PARAM_SPEC = {
+        "expected": (NODES, ()),
+        "threshold": (float, 0.7),
+        "ocr_expected": (NODES, ()),
+    }
+
+    def analyze(
+        self,
+        context: Context,
+        argv: CustomRecognition.AnalyzeArg,
+    ) -> CustomRecognition.AnalyzeResult:
+
+        params = parse_param(argv, self.PARAM_SPEC, "WhereAmI")
+        if params is None:
+            return CustomRecognition.AnalyzeResult(box=None, detail="参数错误")
+        expected = params.get("expected", ())
+        unknown = set(expected) - set(PAGES)
+        if unknown:
+            logger.warning(f"WhereAmI 节点 {argv.node_name} 包含未知页面 {sorted(unknown)}")
+
+        try:
+            page, score, box = page_classifier.classify(
+                context,
+                argv.image,
+                params.get("threshold", 0.7),
+                tuple(expected),
+                tuple(params.get("ocr_expected", ())),
+            )
+        except OSError as e:
+            logger.error(f"WhereAmI 节点 {argv.node_name} 识别失败: {e}")
+            return CustomRecognition.AnalyzeResult(box=None, detail="识别失败")
+        detail = json.dumps({"page": page, "score": round(score, 3)}, ensure_ascii=False)
+        if page is None:
+            return CustomRecognition.AnalyzeResult(box=None, detail=detail)
+        return CustomRecognition.AnalyzeResult(box=box, detail=detail)
@@ -0,0 +1,75 @@
+"""
+该文件的作用为：
+监听节点与任务事件，向故障帧缓冲区与会话录制写入每轮识别前的画面，
+并在识别超时、节点失败、任务失败或执行 StopTask 节点时保存故障帧缓冲区。
+"""
+
+from maa.context import Context, ContextEventSink
+from maa.tasker import Tasker, TaskerEventSink
+from maa.event_sink import NotificationType
+from utils.frame_recorder import frame_recorder
+from utils.session_recorder import session_recorder
+
+
+class FrameRecorderContextSink(ContextEventSink):
+    """记录每轮识别的画面，识别超时或节点失败时保存"""
+
+    def __init__(self):
+        super().__init__()
+        # 节点名 -> 是否为 StopTask 节点
+        self._stop_nodes: dict[str, bool] = {}
+
+    def on_node_next_list(
+        self,
+        context: Context,
+        noti_type: NotificationType,
+        detail: ContextEventSink.NodeNextListDetail,
+    ):
+        if noti_type == NotificationType.Starting:
+            if frame_recorder.enabled or session_recorder.enabled:
+                frame = context.tasker.controller.cached_image
+                frame_recorder.record(frame, detail.name)
+                session_recorder.record(frame, detail.name)
+        elif frame_recorder.enabled and noti_type == NotificationType.Failed:
+            frame_recorder.flush("timeout", detail.name)
+
+    def on_node_pipeline_node(
+        self,
+        context: Context,
+        noti_type: NotificationType,
+        detail: ContextEventSink.NodePipelineNodeDetail,
+    ):
+        if frame_recorder.enabled and noti_type == NotificationType.Failed:
+            frame_recorder.flush("node_failed", detail.name)
+
+    def on_node_action(
+        self,
+        context: Context,
+        noti_type: NotificationType,
+        detail: ContextEventSink.NodeActionDetail,
+    ):
+        if not frame_recorder.enabled or noti_type != NotificationType.Starting:
+            return
+        if self._is_stop_node(context, detail.name):
+            frame_recorder.flush("stop_task", detail.name)
+
+    def _is_stop_node(self, context: Context, node: str) -> bool:
+        is_stop = self._stop_nodes.get(node)
+        if is_stop is None:
+            node_data = context.get_node_data(node) or {}
+            is_stop = node_data.get("action", {}).get("type", "") == "StopTask"
+            self._stop_nodes[node] = is_stop
+        return is_stop
+
+
+class FrameRecorderTaskerSink(TaskerEventSink):
+    """任务失败时保存缓冲区"""
+
+    def on_tasker_task(
+        self,
+        tasker: Tasker,
+        noti_type: NotificationType,
+        detail: TaskerEventSink.TaskerTaskDetail,
+    ):
+        if frame_recorder.enabled and noti_type == NotificationType.Failed:
+            frame_recorder.flush("task_failed", detail.entry)
@@ -0,0 +1,21 @@
+"""
+该文件的作用为：
+任务开始时丢弃识别结果缓存中的节点配置，上一个任务中的 override 不再生效。
+"""
+
+from maa.tasker import Tasker, TaskerEventSink
+from maa.event_sink import NotificationType
+from utils.recognition_cache import recognition_cache
+
+
+class RecognitionCacheTaskerSink(TaskerEventSink):
+    """任务开始时使节点配置缓存失效"""
+
+    def on_tasker_task(
+        self,
+        tasker: Tasker,
+        noti_type: NotificationType,
+        detail: TaskerEventSink.TaskerTaskDetail,
+    ):
+        if noti_type == NotificationType.Starting and recognition_cache.loaded:
+            recognition_cache.invalidate()
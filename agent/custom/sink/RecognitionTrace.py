@@ -0,0 +1,37 @@
+"""
+该文件的作用为：
+监听节点识别事件，记录每个节点的识别次数、命中次数与耗时（开启 recognition_trace 时）。
+"""
+
+import time
+
+from maa.context import Context, ContextEventSink
+from maa.event_sink import NotificationType
+from utils.recognition_trace import recognition_trace
+
+
+class RecognitionTraceSink(ContextEventSink):
+    """识别开始时计时，成功或失败时写入统计"""
+
+    def __init__(self):
+        super().__init__()
+        self._started: dict[str, float] = {}
+
+    def on_node_recognition(
+        self,
+        context: Context,
+        noti_type: NotificationType,
+        detail: ContextEventSink.NodeRecognitionDetail,
+    ):
+        if not recognition_trace.enabled:
+            return
+        if noti_type == NotificationType.Starting:
+            self._started[detail.name] = time.perf_counter()
+            return
+        started = self._started.pop(detail.name, None)
+        if started is not None:
+            recognition_trace.record(
+                detail.name,
+                noti_type == NotificationType.Succeeded,
+                time.perf_counter() - started,
+            )
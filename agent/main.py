@@ -36,9 +36,15 @@ if current_script_dir not in sys.path:
     sys.path.insert(0, current_script_dir)
 
 from utils.logger import logger
+from utils.config import read_config
+from utils.startup_profiler import StartupProfiler
+
+# 启动耗时记录，需由本模块持有（agent() 会清理 utils 模块缓存）
+profiler = StartupProfiler(Path(project_root_dir) / "debug" / "startup_profile.json")
 
 VENV_NAME = ".venv"  # 虚拟环境目录的名称
 VENV_DIR = Path(project_root_dir) / VENV_NAME
+VENV_CACHE_PATH = Path(project_root_dir) / "config" / "venv_cache.json"
 
 # -----
 # region 虚拟环境
@@ -58,17 +64,47 @@ def _is_running_in_our_venv():
     return in_venv
 
 
-def ensure_venv_and_relaunch_if_needed():
+def _load_cached_venv_python() -> Path | None:
     """
-    确保venv存在，并且如果尚未在脚本管理的venv中运行，
-    则在其中重新启动脚本。支持Linux和Windows系统。
+    读取缓存的虚拟环境解释器路径。
+    缓存有效时只需一次 stat 即可确认解释器仍然可用。
     """
-    logger.info(f"检测到系统: {sys.platform}。当前Python解释器: {sys.executable}")
+    try:
+        with open(VENV_CACHE_PATH, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache.get("venv_dir") != str(VENV_DIR):
+            return None
+        python_in_venv = Path(cache["python"])
+        if os.stat(python_in_venv).st_mtime_ns != cache.get("st_mtime_ns"):
+            return None
+    except Exception:
+        return None
+
+    logger.debug(f"使用缓存的虚拟环境解释器: {python_in_venv}")
+    return python_in_venv
 
-    if _is_running_in_our_venv():
-        logger.info(f"已在目标虚拟环境 ({VENV_DIR}) 中运行。")
-        return
 
+def _save_cached_venv_python(python_in_venv: Path):
+    """记录已验证可用的虚拟环境解释器路径"""
+    try:
+        VENV_CACHE_PATH.parent.mkdir(exist_ok=True)
+        with open(VENV_CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "venv_dir": str(VENV_DIR),
+                    "python": str(python_in_venv),
+                    "st_mtime_ns": os.stat(python_in_venv).st_mtime_ns,
+                },
+                f,
+                indent=4,
+                ensure_ascii=False,
+            )
+    except Exception:
+        logger.debug("无法写入 venv_cache.json")
+
+
+def _prepare_venv_python() -> Path:
+    """创建（如需要）并定位虚拟环境中的Python解释器，失败时退出"""
     if not VENV_DIR.exists():
         logger.info(f"正在 {VENV_DIR} 创建虚拟环境...")
         try:
@@ -109,6 +145,32 @@ def ensure_venv_and_relaunch_if_needed():
         logger.error("虚拟环境创建可能失败或虚拟环境结构异常。")
         sys.exit(1)
 
+    _save_cached_venv_python(python_in_venv)
+    return python_in_venv
+
+
+def ensure_venv_and_relaunch_if_needed():
+    """
+    确保venv存在，并且如果尚未在脚本管理的venv中运行，
+    则在其中重新启动脚本。支持Linux和Windows系统。
+
+    relaunch_mode:
+        subprocess: 启动子进程并等待，转发其退出码（默认）
+        exec: 用虚拟环境解释器替换当前进程（Windows 不支持，自动回退为 subprocess）
+    """
+    logger.info(f"检测到系统: {sys.platform}。当前Python解释器: {sys.executable}")
+
+    if _is_running_in_our_venv():
+        logger.info(f"已在目标虚拟环境 ({VENV_DIR}) 中运行。")
+        return
+
+    python_in_venv = _load_cached_venv_python() or _prepare_venv_python()
+
+    relaunch_mode = read_venv_config().get("relaunch_mode", "subprocess")
+    if relaunch_mode == "exec" and sys.platform.startswith("win"):
+        logger.debug("Windows 不支持 exec 重启，回退为 subprocess")
+        relaunch_mode = "subprocess"
+
     logger.info(f"正在使用虚拟环境Python重新启动")
 
     try:
@@ -121,10 +183,21 @@ def ensure_venv_and_relaunch_if_needed():
         cmd = [str(python_in_venv), str(script_abs)] + args
         logger.info(f"执行命令: {' '.join(cmd)}")
 
+        env = os.environ.copy()
+        env.update(profiler.relaunch_env())
+
+        if relaunch_mode == "exec":
+            # 替换当前进程前输出缓冲区中的日志
+            sys.stdout.flush()
+            sys.stderr.flush()
+            if hasattr(logger, "complete"):
+                logger.complete()
+            os.execve(str(python_in_venv), cmd, env)
+
         result = subprocess.run(
             cmd,
             cwd=os.getcwd(),
-            env=os.environ.copy(),
+            env=env,
             check=False,  # 不在非零退出码时抛出异常
         )
         # 退出时使用子进程的退出码
@@ -140,37 +213,6 @@ def ensure_venv_and_relaunch_if_needed():
 # -----
 
 
-def read_config(config_name: str, default_config: dict) -> dict:
-    """
-    通用配置文件读取函数
-
-    Args:
-        config_name: 配置文件名（不含.json后缀）
-        default_config: 默认配置字典
-
-    Returns:
-        配置字典
-    """
-    config_dir = Path("./config")
-    config_dir.mkdir(exist_ok=True)
-    config_path = config_dir / f"{config_name}.json"
-
-    if not config_path.exists():
-        try:
-            with open(config_path, "w", encoding="utf-8") as f:
-                json.dump(default_config, f, indent=4, ensure_ascii=False)
-        except Exception:
-            logger.debug(f"无法写入 {config_name}.json，使用默认配置")
-        return default_config
-
-    try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        logger.exception(f"读取 {config_name}.json 失败，使用默认配置")
-        return default_config
-
-
 def read_interface_version(interface_file_name="./interface.json") -> str:
     interface_path = Path(project_root_dir) / interface_file_name
     assets_interface_path = Path(project_root_dir) / "assets" / interface_file_name
@@ -199,10 +241,40 @@ def read_pip_config() -> dict:
         "enable_pip_install": True,
         "mirror": "https://pypi.tuna.tsinghua.edu.cn/simple",
         "backup_mirror": "https://mirrors.ustc.edu.cn/pypi/simple",
+        "skip_if_unchanged": True,
     }
     return read_config("pip_config", default_config)
 
 
+def read_venv_config() -> dict:
+    """
+    读取虚拟环境重启配置
+    """
+    default_config = {"relaunch_mode": "subprocess"}
+    return read_config("venv", default_config)
+
+
+def read_startup_profile_config() -> dict:
+    """
+    读取启动耗时分析配置
+    """
+    default_config = {"enable_startup_profile": True, "trace_imports": False}
+    return read_config("startup_profile", default_config)
+
+
+def read_supervisor_config() -> dict:
+    """
+    读取多实例监管配置
+    """
+    default_config = {
+        "socket_ids": [],
+        "max_restarts": 5,
+        "restart_backoff": 5,
+        "status_interval": 60,
+    }
+    return read_config("supervisor", default_config)
+
+
 def read_hot_update_config() -> dict:
     """
     读取热更配置
@@ -216,14 +288,22 @@ def read_hot_update_config() -> dict:
 # -----
 
 
+def list_local_wheels() -> list[Path]:
+    """列出本地deps目录中的whl文件（只遍历一次目录）"""
+    deps_dir = Path(project_root_dir) / "deps"
+    if not deps_dir.exists():
+        return []
+    return sorted(deps_dir.glob("*.whl"))
+
+
 def find_local_wheels_dir():
     """查找本地deps目录中的whl文件"""
     project_root = Path(project_root_dir)
     deps_dir = project_root / "deps"
 
-    if deps_dir.exists() and any(deps_dir.glob("*.whl")):
-        whl_count = len(list(deps_dir.glob("*.whl")))
-        logger.debug(f"发现本地deps目录包含 {whl_count} 个 whl 文件")
+    wheels = list_local_wheels()
+    if wheels:
+        logger.debug(f"发现本地deps目录包含 {len(wheels)} 个 whl 文件")
         return deps_dir
 
     logger.debug("未找到deps目录或目录中无 whl 文件")
@@ -371,10 +451,30 @@ def check_and_install_dependencies():
     logger.debug(f"启用 pip 安装依赖: {enable_pip_install}")
 
     if enable_pip_install:
+        from utils.dependency_checker import (
+            clear_fingerprint,
+            is_dependency_cache_valid,
+            save_fingerprint,
+        )
+
+        req_path = Path(project_root_dir) / "requirements.txt"
+        skip_if_unchanged = pip_config.get("skip_if_unchanged", True)
+
+        if (
+            skip_if_unchanged
+            and req_path.exists()
+            and is_dependency_cache_valid(req_path, list_local_wheels())
+        ):
+            logger.info("依赖指纹未变化，跳过依赖安装")
+            return
+
         logger.info("开始安装/更新依赖")
         if install_requirements(pip_config=pip_config):
             logger.info("依赖检查和安装完成")
+            # pip 可能升级了包，安装完成后重新列出 whl 并记录最新指纹
+            save_fingerprint(req_path, list_local_wheels())
         else:
+            clear_fingerprint()
             logger.warning("依赖安装失败，程序可能无法正常运行")
     else:
         logger.info("Pip 依赖安装已禁用，跳过依赖安装")
@@ -387,23 +487,24 @@ def check_and_install_dependencies():
 
 def agent(is_dev_mode=False):
     try:
-        # 清理模块缓存
-        utils_modules = [
-            name for name in list(sys.modules.keys()) if name.startswith("utils")
-        ]
-        for module_name in utils_modules:
-            del sys.modules[module_name]
+        with profiler.phase("reload_utils"):
+            # 清理模块缓存
+            utils_modules = [
+                name for name in list(sys.modules.keys()) if name.startswith("utils")
+            ]
+            for module_name in utils_modules:
+                del sys.modules[module_name]
 
-        # 动态导入 utils 的所有内容
-        import utils
-        import importlib
+            # 动态导入 utils 的所有内容
+            import utils
+            import importlib
 
-        importlib.reload(utils)
+            importlib.reload(utils)
 
-        # 将 utils 的所有公共属性导入到当前命名空间
-        for attr_name in dir(utils):
-            if not attr_name.startswith("_"):
-                globals()[attr_name] = getattr(utils, attr_name)
+            # 将 utils 的所有公共属性导入到当前命名空间
+            for attr_name in dir(utils):
+                if not attr_name.startswith("_"):
+                    globals()[attr_name] = getattr(utils, attr_name)
 
         if is_dev_mode:
             from utils.logger import change_console_level
@@ -472,13 +573,16 @@ def agent(is_dev_mode=False):
         #         save_manifest_cache_from_result(manifest_result)
         #     # ========== 热更新结束 ==========
 
-        from maa.agent.agent_server import AgentServer
-        from maa.toolkit import Toolkit
-        
-        import custom
-        import Agent_file
+        with profiler.phase("import_maa"):
+            from maa.agent.agent_server import AgentServer
+            from maa.toolkit import Toolkit
+
+        with profiler.phase("import_custom"):
+            import custom
+            import Agent_file
 
-        Toolkit.init_option("./")
+        with profiler.phase("Toolkit.init_option"):
+            Toolkit.init_option("./")
 
         if len(sys.argv) < 2:
             logger.error("缺少必要的 socket_id 参数")
@@ -487,9 +591,41 @@ def agent(is_dev_mode=False):
         socket_id = sys.argv[-1]
         logger.debug(f"socket_id: {socket_id}")
 
-        AgentServer.start_up(socket_id)
+        with profiler.phase("AgentServer.start_up"):
+            AgentServer.start_up(socket_id)
         logger.info("AgentServer启动")
+        profiler.write_report()
+
+        # 开发模式下监听自定义动作源文件，修改后增量重载
+        hot_reloader = None
+        if is_dev_mode:
+            from utils.hot_reload import ActionHotReloader
+
+            hot_reloader = ActionHotReloader(Path(current_script_dir))
+            hot_reloader.start()
+
         AgentServer.join()
+        if hot_reloader:
+            hot_reloader.stop()
+
+        # 写完后台队列中的截图、会话录制与识别统计
+        from utils.screenshot_writer import screenshot_writer
+        from utils.session_recorder import session_recorder
+        from utils.recognition_trace import recognition_trace
+
+        screenshot_writer.shutdown()
+        if session_recorder.loaded:
+            session_recorder.close()
+        if recognition_trace.loaded:
+            recognition_trace.flush()
+
+        from utils.recognition_cache import recognition_cache
+        from utils.parallel_recognition import parallel_recognizer
+
+        if recognition_cache.loaded and (recognition_cache.hits or recognition_cache.misses):
+            logger.info(f"识别结果缓存统计: {recognition_cache.stats()}")
+        if parallel_recognizer.calls or parallel_recognizer.inline_calls:
+            logger.info(f"并行识别统计: {parallel_recognizer.stats()}")
         AgentServer.shut_down()
         logger.info("AgentServer关闭")
     except ImportError as e:
@@ -501,25 +637,74 @@ def agent(is_dev_mode=False):
         raise
 
 
+def run_supervisor(socket_ids: list[str]):
+    """
+    多实例监管模式：每个 socket_id 一个工作进程，
+    虚拟环境与依赖检查已在本进程完成，工作进程直接启动 agent。
+    """
+    from utils.agent_supervisor import AgentSupervisor
+
+    supervisor_config = read_supervisor_config()
+    if not socket_ids:
+        socket_ids = [str(i) for i in supervisor_config.get("socket_ids", [])]
+
+    logger.info(f"监管模式，实例: {socket_ids}")
+    supervisor = AgentSupervisor(
+        script_path=current_file_path,
+        socket_ids=socket_ids,
+        status_path=Path(project_root_dir) / "debug" / "supervisor_status.json",
+        cwd=project_root_dir,
+        max_restarts=supervisor_config.get("max_restarts", 5),
+        restart_backoff=supervisor_config.get("restart_backoff", 5),
+        status_interval=supervisor_config.get("status_interval", 60),
+    )
+    sys.exit(supervisor.run())
+
+
 # -----
 # region 程序入口
 # -----
 
 
 def main():
-    current_version = read_interface_version()
+    profile_config = read_startup_profile_config()
+    profiler.configure(
+        enabled=profile_config.get("enable_startup_profile", True),
+        trace_imports=profile_config.get("trace_imports", False),
+    )
+
+    with profiler.phase("read_interface_version"):
+        current_version = read_interface_version()
     is_dev_mode = current_version == "DEBUG"
 
-    # 如果是Linux系统或开发模式，启动虚拟环境
-    if sys.platform.startswith("linux") or is_dev_mode:
-        ensure_venv_and_relaunch_if_needed()
+    # 由监管进程启动的工作进程，虚拟环境与依赖已由监管进程处理
+    from utils.agent_supervisor import WORKER_ENV_KEY
 
-    check_and_install_dependencies()
+    is_worker = os.environ.get(WORKER_ENV_KEY) == "1"
+
+    if is_worker:
+        # 各工作进程分别写入自己的启动耗时报告
+        profiler.configure(
+            report_path=Path(project_root_dir) / "debug" / f"startup_profile_{sys.argv[-1]}.json"
+        )
+
+    if not is_worker:
+        # 如果是Linux系统或开发模式，启动虚拟环境
+        if sys.platform.startswith("linux") or is_dev_mode:
+            with profiler.phase("ensure_venv_and_relaunch_if_needed"):
+                ensure_venv_and_relaunch_if_needed()
+
+        with profiler.phase("check_and_install_dependencies"):
+            check_and_install_dependencies()
 
     if is_dev_mode:
         os.chdir(Path("./assets"))
         logger.info(f"set cwd: {os.getcwd()}")
 
+    # 监管模式: main.py --supervise [socket_id ...]，未给出时使用 config/supervisor.json
+    if "--supervise" in sys.argv and not is_worker:
+        run_supervisor(sys.argv[sys.argv.index("--supervise") + 1 :])
+
     agent(is_dev_mode=is_dev_mode)
 
 
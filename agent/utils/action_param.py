@@ -0,0 +1,131 @@
+"""
+自定义动作参数解析缓存
+该文件的作用为：
+解析 custom_action_param / custom_recognition_param（JSON 字符串）并按参数表校验、补全默认值，
+结果以 (动作名, 节点名, 参数哈希) 为键缓存，相同参数不会重复解析。
+参数不合法时只在第一次输出错误，之后直接返回 None。
+"""
+
+import json
+import threading
+from types import MappingProxyType
+from collections import OrderedDict
+
+from utils.logger import logger
+
+# 参数表中表示必填参数的默认值
+REQUIRED = object()
+# 参数表中表示节点名列表的类型：可写为单个字符串或字符串列表，解析为 tuple
+NODES = "nodes"
+
+_CACHE_SIZE = 256
+_cache: OrderedDict[tuple, tuple] = OrderedDict()
+_lock = threading.Lock()
+
+
+class ParamError(ValueError):
+    """custom_action_param 不合法"""
+
+
+def _convert(key: str, value, expected_type):
+    if expected_type == NODES:
+        if isinstance(value, str):
+            return (value,) if value else ()
+        if isinstance(value, list) and all(isinstance(node, str) for node in value):
+            return tuple(value)
+        raise ParamError(f"{key} 应为节点名或节点名列表，实际为 {value!r}")
+
+    if expected_type is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    # bool 是 int 的子类，需单独排除
+    if expected_type is int and isinstance(value, bool):
+        raise ParamError(f"{key} 应为 int，实际为 bool")
+    if not isinstance(value, expected_type):
+        raise ParamError(
+            f"{key} 应为 {expected_type.__name__}，实际为 {type(value).__name__}"
+        )
+    return value
+
+
+def _validate(raw: str, spec: dict | None, check=None):
+    try:
+        data = json.loads(raw) if raw else {}
+    except json.JSONDecodeError as e:
+        raise ParamError(f"不是合法的 JSON: {e}") from None
+    if not isinstance(data, dict):
+        raise ParamError(f"应为 JSON 对象，实际为 {type(data).__name__}")
+
+    # 没有必填参数时空参数保持为空，由动作自行决定如何处理
+    if spec is None or (
+        not data and all(field[1] is not REQUIRED for field in spec.values())
+    ):
+        return MappingProxyType(data)
+
+    params = {}
+    for key, (expected_type, default, *choices) in spec.items():
+        if key not in data:
+            if default is REQUIRED:
+                raise ParamError(f"缺少必填参数 {key}")
+            params[key] = default
+            continue
+        value = _convert(key, data[key], expected_type)
+        if choices and value not in choices[0]:
+            raise ParamError(f"{key} 应为 {list(choices[0])} 之一，实际为 {value!r}")
+        params[key] = value
+
+    unknown = set(data) - set(spec)
+    if unknown:
+        logger.debug(f"忽略未知参数: {sorted(unknown)}")
+    if check is not None:
+        check(params)
+    return MappingProxyType(params)
+
+
+def parse_param(argv, spec: dict | None = None, action: str = "", check=None):
+    """
+    解析并缓存自定义动作参数
+
+    Args:
+        argv: CustomAction.RunArg 或 CustomRecognition.AnalyzeArg，
+              使用其 node_name 与 custom_action_param / custom_recognition_param
+        spec: 参数表 {参数名: (类型, 默认值[, 可选值])}，类型可为 int/float/bool/str/list/dict/NODES，
+              默认值为 REQUIRED 表示必填，给出可选值时参数必须是其中之一；
+              为 None 时只要求是 JSON 对象
+        action: 动作名，用于区分缓存与错误信息
+        check: 可选的校验函数，接收补全后的参数字典，参数之间不匹配时抛出 ParamError
+
+    Returns:
+        只读的参数映射（未出现的参数已补全默认值，请勿修改），参数不合法时返回 None
+    """
+    raw = getattr(argv, "custom_action_param", None)
+    if raw is None:
+        raw = getattr(argv, "custom_recognition_param", None)
+    raw = raw or ""
+    key = (action, argv.node_name, hash(raw))
+
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == raw:
+            _cache.move_to_end(key)
+            result = cached[1]
+            return None if isinstance(result, ParamError) else result
+
+    try:
+        result = _validate(raw, spec, check)
+    except ParamError as e:
+        # 只在第一次遇到该参数时报错
+        logger.error(f"{action} 节点 {argv.node_name} 参数错误: {e}，参数: {raw}")
+        result = e
+
+    with _lock:
+        _cache[key] = (raw, result)
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return None if isinstance(result, ParamError) else result
+
+
+def clear_cache():
+    """清空参数缓存（热重载后参数表可能变化）"""
+    with _lock:
+        _cache.clear()
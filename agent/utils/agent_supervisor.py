@@ -0,0 +1,188 @@
+"""
+多实例 Agent 监管
+该文件的作用为：
+在一次安装/启动检查之后，为每个 socket_id 启动一个独立的 Agent 工作进程
+（AgentServer 每个进程只能服务一个 socket_id），定期报告各实例存活状态，
+并且只重启异常退出的实例。
+"""
+
+import os
+import sys
+import json
+import time
+import subprocess
+from pathlib import Path
+
+from utils.logger import logger
+
+# 工作进程通过该环境变量得知自己由监管进程启动，跳过虚拟环境与依赖检查
+WORKER_ENV_KEY = "M2GYRO_AGENT_WORKER"
+
+
+class AgentWorker:
+    """单个 socket_id 对应的工作进程状态"""
+
+    def __init__(self, socket_id: str):
+        self.socket_id = socket_id
+        self.process: subprocess.Popen | None = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.last_returncode: int | None = None
+        self.gave_up = False
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def status(self) -> dict:
+        return {
+            "socket_id": self.socket_id,
+            "alive": self.alive,
+            "pid": self.process.pid if self.process else None,
+            "uptime_seconds": round(time.time() - self.started_at, 1) if self.alive else 0,
+            "restarts": self.restarts,
+            "last_returncode": self.last_returncode,
+            "gave_up": self.gave_up,
+        }
+
+
+class AgentSupervisor:
+    """
+    启动并监管多个 Agent 工作进程。
+
+    工作进程正常退出（返回码 0）视为该实例结束，不再重启；
+    异常退出时在 restart_backoff 秒后重启，超过 max_restarts 次后放弃该实例。
+    """
+
+    def __init__(
+        self,
+        script_path: str,
+        socket_ids: list[str],
+        status_path: Path,
+        cwd: str | None = None,
+        max_restarts: int = 5,
+        restart_backoff: float = 5,
+        status_interval: float = 60,
+        poll_interval: float = 1,
+    ):
+        self.script_path = script_path
+        self.workers = [AgentWorker(socket_id) for socket_id in dict.fromkeys(socket_ids)]
+        self.status_path = Path(status_path)
+        # 工作进程的工作目录；工作进程会自行切换到开发模式所需的目录，不能继承监管进程当前的目录
+        self.cwd = cwd or os.getcwd()
+        self.max_restarts = max_restarts
+        self.restart_backoff = restart_backoff
+        self.status_interval = status_interval
+        self.poll_interval = poll_interval
+
+    def _spawn(self, worker: AgentWorker):
+        env = os.environ.copy()
+        env[WORKER_ENV_KEY] = "1"
+        cmd = [sys.executable, "-u", self.script_path, worker.socket_id]
+        logger.debug(f"启动工作进程: {' '.join(cmd)}")
+        worker.process = subprocess.Popen(cmd, cwd=self.cwd, env=env)
+        worker.started_at = time.time()
+        logger.info(f"实例 {worker.socket_id} 已启动，pid: {worker.process.pid}")
+
+    def _write_status(self):
+        try:
+            self.status_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.status_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "updated_at": time.time(),
+                        "workers": [worker.status() for worker in self.workers],
+                    },
+                    f,
+                    indent=4,
+                    ensure_ascii=False,
+                )
+        except Exception:
+            logger.debug(f"无法写入监管状态文件: {self.status_path}")
+
+    def _report(self):
+        alive = [worker.socket_id for worker in self.workers if worker.alive]
+        logger.info(f"存活实例 {len(alive)}/{len(self.workers)}: {alive}")
+        self._write_status()
+
+    def _check(self, worker: AgentWorker, restart_due: dict) -> bool:
+        """检查一个实例，返回该实例是否仍需监管"""
+        if worker.gave_up or worker.process is None:
+            return False
+
+        returncode = worker.process.poll()
+        if returncode is None:
+            return True
+
+        if worker.socket_id in restart_due:
+            if time.time() < restart_due[worker.socket_id]:
+                return True
+            del restart_due[worker.socket_id]
+            worker.restarts += 1
+            self._spawn(worker)
+            self._write_status()
+            return True
+
+        worker.last_returncode = returncode
+        if returncode == 0:
+            logger.info(f"实例 {worker.socket_id} 已正常退出")
+            worker.process = None
+            self._write_status()
+            return False
+
+        if worker.restarts >= self.max_restarts:
+            logger.error(
+                f"实例 {worker.socket_id} 异常退出（返回码 {returncode}），已重启 {worker.restarts} 次，放弃重启"
+            )
+            worker.gave_up = True
+            self._write_status()
+            return False
+
+        logger.warning(
+            f"实例 {worker.socket_id} 异常退出（返回码 {returncode}），{self.restart_backoff} 秒后重启"
+        )
+        restart_due[worker.socket_id] = time.time() + self.restart_backoff
+        self._write_status()
+        return True
+
+    def run(self) -> int:
+        """启动所有实例并阻塞监管，所有实例结束后返回（有实例被放弃时返回 1）"""
+        if not self.workers:
+            logger.error("监管模式下未配置任何 socket_id")
+            return 1
+
+        for worker in self.workers:
+            self._spawn(worker)
+        self._write_status()
+
+        restart_due: dict[str, float] = {}
+        last_report = time.time()
+        try:
+            while True:
+                active = [worker for worker in self.workers if self._check(worker, restart_due)]
+                if not active:
+                    break
+                if time.time() - last_report >= self.status_interval:
+                    self._report()
+                    last_report = time.time()
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            logger.info("收到中断，正在停止所有实例")
+        finally:
+            self.stop()
+
+        return 1 if any(worker.gave_up for worker in self.workers) else 0
+
+    def stop(self, timeout: float = 10):
+        """终止仍在运行的实例"""
+        for worker in self.workers:
+            if worker.alive:
+                worker.process.terminate()
+        for worker in self.workers:
+            if worker.process is None:
+                continue
+            try:
+                worker.process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                worker.process.kill()
+        self._write_status()
@@ -0,0 +1,96 @@
+"""
+配置文件读取
+该文件的作用为：
+读取 ./config 下的 JSON 配置，不存在时写入默认配置，供 main.py 与自定义动作共用。
+自定义识别/动作使用的单例通过 LazyInstance 在第一次使用时才读取配置，
+配置与输出目录按项目根目录解析（开发模式下工作目录为 assets，不能写入资源目录）。
+"""
+
+import json
+import threading
+from pathlib import Path
+
+from utils.logger import logger
+
+# 项目根目录（agent 目录的上一级），即 main.py 启动时切换到的工作目录
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def project_path(path) -> Path:
+    """相对路径按项目根目录解析，绝对路径保持不变"""
+    path = Path(path)
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+def read_config(config_name: str, default_config: dict, config_dir=None) -> dict:
+    """
+    通用配置文件读取函数
+
+    Args:
+        config_name: 配置文件名（不含.json后缀）
+        default_config: 默认配置字典
+        config_dir: 配置目录，默认为当前工作目录下的 ./config
+
+    Returns:
+        配置字典
+    """
+    config_dir = Path(config_dir) if config_dir is not None else Path("./config")
+    config_dir.mkdir(parents=True, exist_ok=True)
+    config_path = config_dir / f"{config_name}.json"
+
+    if not config_path.exists():
+        try:
+            with open(config_path, "w", encoding="utf-8") as f:
+                json.dump(default_config, f, indent=4, ensure_ascii=False)
+        except Exception:
+            logger.debug(f"无法写入 {config_name}.json，使用默认配置")
+        return default_config
+
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        logger.exception(f"读取 {config_name}.json 失败，使用默认配置")
+        return default_config
+
+
+def read_agent_config(config_name: str, default_config: dict) -> dict:
+    """读取项目根目录 config 下的配置，未填写的项使用默认值"""
+    config = read_config(config_name, default_config, project_path("config"))
+    return {**default_config, **config}
+
+
+class LazyInstance:
+    """
+    延迟创建的单例代理，第一次访问属性时才调用 factory（读取配置、创建目录），
+    导入模块本身不会产生任何文件。
+
+    用法:
+        frame_recorder = LazyInstance(_load_frame_recorder)
+        frame_recorder.record(...)  # 第一次访问时创建
+    """
+
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    @property
+    def loaded(self) -> bool:
+        """是否已经创建（未创建时无需 flush/close）"""
+        return self._instance is not None
+
+    def _get(self):
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    object.__setattr__(self, "_instance", self._factory())
+                instance = self._instance
+        return instance
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._get(), name, value)
@@ -0,0 +1,138 @@
+"""
+Count 计数断点
+该文件的作用为：
+把开启 checkpoint 的 Count 节点计数以追加方式写入项目根目录 config 下的日志文件，
+agent 或模拟器意外退出后，同一任务入口（task entry）再次运行时自动恢复计数。
+日志行数过多时压缩为每个节点一行。
+"""
+
+import os
+import json
+import time
+import threading
+from pathlib import Path
+
+from utils.logger import logger
+from utils.config import LazyInstance, project_path
+
+
+class CountCheckpoint:
+    """
+    计数断点日志。
+
+    每行格式: {"entry": 任务入口, "node": 节点名, "count": 计数, "time": 时间戳}
+    count 为 0 表示该节点已重置，压缩时删除。
+    """
+
+    def __init__(self, path: Path, compact_threshold: int = 500):
+        self.path = Path(path)
+        self.compact_threshold = compact_threshold
+        self._state: dict[str, dict[str, int]] | None = None
+        self._lines = 0
+        # 日志中有不完整的行时，下一次写入改为整体重写，避免新记录接在残行后面
+        self._needs_compact = False
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """读取并重放日志，只在第一次使用时执行"""
+        if self._state is not None:
+            return
+        self._state = {}
+        if not self.path.exists():
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    self._lines += 1
+                    try:
+                        record = json.loads(line)
+                        entry, node, count = record["entry"], record["node"], record["count"]
+                    except (ValueError, KeyError, TypeError):
+                        # 进程在写入过程中退出时，最后一行可能不完整
+                        self._needs_compact = True
+                        continue
+                    self._apply(entry, node, count)
+        except OSError:
+            logger.exception(f"读取计数断点失败: {self.path}")
+            return
+
+        if self._state:
+            logger.info(f"已读取计数断点: {self._state}")
+
+    def _apply(self, entry: str, node: str, count: int):
+        nodes = self._state.setdefault(entry, {})
+        if count:
+            nodes[node] = count
+        else:
+            nodes.pop(node, None)
+            if not nodes:
+                del self._state[entry]
+
+    def get(self, entry: str, node: str) -> int | None:
+        """读取断点中的计数，没有记录时返回 None"""
+        with self._lock:
+            self._load()
+            return self._state.get(entry, {}).get(node)
+
+    def record(self, entry: str, node: str, count: int):
+        """追加一条计数记录"""
+        with self._lock:
+            self._load()
+            if self._state.get(entry, {}).get(node, 0) == count:
+                return
+            self._apply(entry, node, count)
+            try:
+                if self._needs_compact:
+                    self._compact()
+                    return
+                self._append(
+                    {"entry": entry, "node": node, "count": count, "time": time.time()}
+                )
+                if self._lines >= self.compact_threshold:
+                    self._compact()
+            except OSError:
+                logger.exception(f"写入计数断点失败: {self.path}")
+
+    def _append(self, record: dict):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._lines += 1
+
+    def _compact(self):
+        """把日志重写为当前状态，每个节点一行"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        now = time.time()
+        lines = 0
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry, nodes in self._state.items():
+                for node, count in nodes.items():
+                    record = {"entry": entry, "node": node, "count": count, "time": now}
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    lines += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._lines = lines
+        self._needs_compact = False
+        logger.debug(f"计数断点已压缩为 {lines} 条记录")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+count_checkpoint = LazyInstance(
+    lambda: CountCheckpoint(project_path("config") / "count_checkpoint.jsonl")
+)
@@ -0,0 +1,114 @@
+"""
+进程内计数器存储
+该文件的作用为：
+以 (task_id, 节点名) 为键在内存中保存 Count 节点的计数，
+避免每次计数都读取并覆盖流水线；需要其他节点读取 count 时再显式同步回流水线。
+"""
+
+import threading
+from collections import OrderedDict
+
+from utils.override_batch import OverrideBatch
+
+
+class CounterStore:
+    """
+    计数器注册表。
+
+    每个任务（task_id）一组计数，首次读取某节点时以流水线参数中的 count 为初值。
+    仅保留最近 max_tasks 个任务的计数，旧任务自动丢弃。
+    """
+
+    def __init__(self, max_tasks: int = 16):
+        self.max_tasks = max_tasks
+        self._tasks: OrderedDict[int, dict[str, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _task(self, task_id: int) -> dict[str, int]:
+        counters = self._tasks.get(task_id)
+        if counters is None:
+            counters = self._tasks[task_id] = {}
+            while len(self._tasks) > self.max_tasks:
+                self._tasks.popitem(last=False)
+        else:
+            self._tasks.move_to_end(task_id)
+        return counters
+
+    def has(self, task_id: int, node: str) -> bool:
+        """该任务中节点是否已有计数"""
+        with self._lock:
+            return node in self._tasks.get(task_id, {})
+
+    def get(self, task_id: int, node: str, default: int = 0) -> int:
+        """读取计数，不存在时记录并返回 default"""
+        with self._lock:
+            return self._task(task_id).setdefault(node, default)
+
+    def set(self, task_id: int, node: str, value: int):
+        with self._lock:
+            self._task(task_id)[node] = value
+
+    def increment(self, task_id: int, node: str, default: int = 0) -> int:
+        """计数加一并返回新值"""
+        with self._lock:
+            counters = self._task(task_id)
+            counters[node] = counters.get(node, default) + 1
+            return counters[node]
+
+    def reset(self, task_id: int, nodes: str | list, value: int = 0):
+        """将一个或多个节点的计数设为 value"""
+        if isinstance(nodes, str):
+            nodes = [nodes]
+        with self._lock:
+            counters = self._task(task_id)
+            for node in nodes:
+                counters[node] = value
+
+    def snapshot(self, task_id: int) -> dict[str, int]:
+        """返回任务计数的副本"""
+        with self._lock:
+            return dict(self._tasks.get(task_id, {}))
+
+    def discard(self, task_id: int):
+        with self._lock:
+            self._tasks.pop(task_id, None)
+
+    def sync_to_pipeline(self, context, task_id: int, nodes: str | list | None = None):
+        """
+        把内存中的计数写回流水线中 Count 节点的 custom_action_param.count，
+        所有节点合并为一次 override_pipeline
+
+        Args:
+            context: 当前任务的 Context
+            task_id: 任务 id
+            nodes: 需要同步的节点，为空时同步该任务的全部计数
+        """
+        counters = self.snapshot(task_id)
+        if nodes is None:
+            nodes = list(counters)
+        elif isinstance(nodes, str):
+            nodes = [nodes]
+
+        with OverrideBatch(context, "Count") as batch:
+            for node in nodes:
+                if node not in counters:
+                    batch.skip(node, "无计数记录")
+                    continue
+                node_data = context.get_node_data(node) or {}
+                # get_node_data返回值为node_data:{"action":{"param":{"custom_action_param"}}}
+                node_action_param = node_data.get("action", {}).get("param", {})
+                if node_action_param.get("custom_action", "") != "Count":
+                    batch.skip(node, "不是 Count 节点")
+                    continue
+
+                node_custom_action_param = node_action_param.get("custom_action_param", {})
+                if not node_custom_action_param:
+                    batch.skip(node, "custom_action_param 为空")
+                    continue
+
+                # 直接修改node_custom_action_param防止漏掉或新增参数
+                node_custom_action_param["count"] = counters[node]
+                batch.add(node, {"custom_action_param": node_custom_action_param})
+
+
+counter_store = CounterStore()
@@ -0,0 +1,158 @@
+"""
+依赖安装指纹缓存
+该文件的作用为：
+记录上次成功安装依赖时的环境指纹（解释器路径与版本、requirements.txt 哈希、
+deps 目录下的 whl 集合、已安装分发包版本），保存在 ./config 下。
+热启动时在进程内读取已安装包的元数据并比对指纹，一致则无需再调用 pip。
+"""
+
+import re
+import sys
+import json
+import hashlib
+from pathlib import Path
+from importlib import metadata
+
+from utils.logger import logger
+
+CACHE_PATH = Path("./config") / "dependency_cache.json"
+CACHE_VERSION = 1
+
+# requirements.txt 中一行的包名与版本约束，如 "maafw==5.7.0"、"loguru"
+_REQUIREMENT_PATTERN = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*(.*)$")
+
+
+def _normalize_name(name: str) -> str:
+    """按 PEP 503 规范化包名"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def parse_requirements(req_path: Path) -> dict[str, str]:
+    """
+    解析 requirements.txt，返回 {规范化包名: 版本约束}
+
+    仅支持本项目用到的简单写法（包名 + 可选约束），忽略注释、空行与 pip 选项。
+    """
+    requirements = {}
+    with open(req_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line or line.startswith("-"):
+                continue
+            match = _REQUIREMENT_PATTERN.match(line)
+            if not match:
+                continue
+            spec = match.group(2).split(";", 1)[0].strip()
+            requirements[_normalize_name(match.group(1))] = spec
+    return requirements
+
+
+def get_installed_versions(names) -> dict[str, str | None]:
+    """读取当前解释器中已安装分发包的版本，未安装时为 None"""
+    versions = {}
+    for name in names:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def _file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def build_fingerprint(req_path: Path, wheels: list[Path]) -> dict:
+    """
+    计算当前环境的依赖指纹
+
+    Args:
+        req_path: requirements.txt 路径
+        wheels: deps 目录下的 whl 文件列表
+
+    Returns:
+        指纹字典，可直接序列化为 JSON
+    """
+    requirements = parse_requirements(req_path)
+    return {
+        "cache_version": CACHE_VERSION,
+        "executable": sys.executable,
+        "python_version": sys.version,
+        "requirements_sha256": _file_sha256(req_path),
+        "wheels": sorted(f"{whl.name}:{whl.stat().st_size}" for whl in wheels),
+        "installed": get_installed_versions(sorted(requirements)),
+    }
+
+
+def _pins_satisfied(requirements: dict[str, str], installed: dict) -> bool:
+    """检查 requirements 是否都已安装，且 == 固定版本与已安装版本一致"""
+    for name, spec in requirements.items():
+        version = installed.get(name)
+        if version is None:
+            logger.debug(f"依赖 {name} 未安装")
+            return False
+        if spec.startswith("==") and spec[2:].strip() != version:
+            logger.debug(f"依赖 {name} 版本不一致: 需要 {spec[2:].strip()}, 已安装 {version}")
+            return False
+    return True
+
+
+def load_fingerprint() -> dict | None:
+    """读取上次保存的依赖指纹，不存在或损坏时返回 None"""
+    if not CACHE_PATH.exists():
+        return None
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        logger.debug(f"读取 {CACHE_PATH.name} 失败，视为无缓存")
+        return None
+
+
+def save_fingerprint(req_path: Path, wheels: list[Path]) -> None:
+    """在依赖安装成功后保存当前环境指纹"""
+    try:
+        fingerprint = build_fingerprint(req_path, wheels)
+        CACHE_PATH.parent.mkdir(exist_ok=True)
+        with open(CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump(fingerprint, f, indent=4, ensure_ascii=False)
+        logger.debug(f"依赖指纹已保存至 {CACHE_PATH}")
+    except Exception:
+        logger.exception("保存依赖指纹失败")
+
+
+def clear_fingerprint() -> None:
+    """删除依赖指纹，下次启动时重新执行 pip"""
+    try:
+        CACHE_PATH.unlink(missing_ok=True)
+    except Exception:
+        logger.debug(f"删除 {CACHE_PATH.name} 失败")
+
+
+def is_dependency_cache_valid(req_path: Path, wheels: list[Path]) -> bool:
+    """
+    判断依赖是否与上次成功安装时一致
+
+    Returns:
+        True 表示可以跳过 pip 安装
+    """
+    cached = load_fingerprint()
+    if not cached:
+        logger.debug("无依赖指纹缓存")
+        return False
+
+    try:
+        current = build_fingerprint(req_path, wheels)
+    except Exception:
+        logger.exception("计算依赖指纹失败")
+        return False
+
+    if not _pins_satisfied(parse_requirements(req_path), current["installed"]):
+        return False
+
+    changed = [key for key in current if cached.get(key) != current[key]]
+    if changed:
+        logger.debug(f"依赖指纹变化: {', '.join(changed)}")
+        return False
+
+    return True
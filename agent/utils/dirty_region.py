@@ -0,0 +1,140 @@
+"""
+ROI 变化跟踪
+该文件的作用为：
+把画面划分为固定大小的方块，与上一帧逐块比较，记录每个方块最后一次变化时的版本号。
+自定义识别与 SkipIfUnchanged 动作可以据此判断"某个 ROI 自上次得出结论后是否变化"，
+未变化时直接沿用上一次的结论，减少空闲与菜单阶段的识别开销。
+
+用法:
+    dirty_regions.update(image)
+    hit, verdict = dirty_regions.lookup("放弃挑战", [830, 590, 450, 130])
+    if not hit:
+        verdict = ...  # 重新识别
+        dirty_regions.remember("放弃挑战", [830, 590, 450, 130], verdict)
+"""
+
+import threading
+
+import numpy
+
+# 比较前的降采样步长
+_SAMPLE_STEP = 2
+
+
+class DirtyRegionTracker:
+    """
+    分块变化图。
+
+    update() 对相同画面是幂等的：没有方块变化时版本号不增加，
+    因此多个节点对同一帧重复调用不会互相影响。
+    """
+
+    def __init__(self, tile_size: int = 32, threshold: float = 6.0):
+        """
+        Args:
+            tile_size: 方块边长（原始画面像素）
+            threshold: 方块内三通道亮度和的平均差超过该值即视为变化（0-765）
+        """
+        self.tile_size = max(_SAMPLE_STEP, tile_size)
+        self.threshold = threshold
+        self.version = 0
+        self._shape: tuple | None = None
+        self._previous: numpy.ndarray | None = None
+        self._tile_versions: numpy.ndarray | None = None
+        self._verdicts: dict[str, tuple[int, tuple, object]] = {}
+        self._lock = threading.Lock()
+
+    def _gray(self, image: numpy.ndarray) -> numpy.ndarray:
+        small = image[::_SAMPLE_STEP, ::_SAMPLE_STEP]
+        if small.ndim == 3:
+            return small.sum(axis=2, dtype=numpy.int16)
+        return small.astype(numpy.int16)
+
+    def update(self, image: numpy.ndarray) -> int:
+        """比较新一帧与上一帧，更新变化图并返回当前版本号"""
+        if image is None or image.size == 0:
+            return self.version
+        gray = self._gray(image)
+        step = self.tile_size // _SAMPLE_STEP
+
+        with self._lock:
+            if self._shape != image.shape:
+                # 分辨率变化：全部方块视为已变化
+                self._shape = image.shape
+                rows = -(-gray.shape[0] // step)
+                cols = -(-gray.shape[1] // step)
+                self.version += 1
+                self._tile_versions = numpy.full((rows, cols), self.version, dtype=numpy.int64)
+                self._previous = gray
+                return self.version
+
+            diff = numpy.abs(gray - self._previous)
+            rows = numpy.arange(0, gray.shape[0], step)
+            cols = numpy.arange(0, gray.shape[1], step)
+            sums = numpy.add.reduceat(
+                numpy.add.reduceat(diff, rows, axis=0, dtype=numpy.int64), cols, axis=1
+            )
+            areas = numpy.outer(
+                numpy.diff(numpy.append(rows, gray.shape[0])),
+                numpy.diff(numpy.append(cols, gray.shape[1])),
+            )
+            dirty = sums > self.threshold * areas
+            if dirty.any():
+                self.version += 1
+                self._tile_versions[dirty] = self.version
+                # 只更新变化方块的基准，未达到阈值的缓慢变化继续与旧基准比较，累积后仍会被发现
+                mask = dirty.repeat(step, axis=0).repeat(step, axis=1)
+                numpy.copyto(
+                    self._previous, gray, where=mask[: gray.shape[0], : gray.shape[1]]
+                )
+            return self.version
+
+    def _tiles(self, roi) -> tuple[slice, slice]:
+        x, y, w, h = roi
+        height, width = self._shape[:2]
+        if w <= 0 or h <= 0:
+            x, y, w, h = 0, 0, width, height
+        top = max(0, y) // self.tile_size
+        left = max(0, x) // self.tile_size
+        bottom = -(-min(height, y + h) // self.tile_size)
+        right = -(-min(width, x + w) // self.tile_size)
+        return slice(top, max(top + 1, bottom)), slice(left, max(left + 1, right))
+
+    def changed_since(self, roi, version: int) -> bool:
+        """ROI [x, y, w, h] 内是否有方块在 version 之后变化过"""
+        with self._lock:
+            if self._tile_versions is None:
+                return True
+            rows, cols = self._tiles(roi)
+            tiles = self._tile_versions[rows, cols]
+            return tiles.size == 0 or int(tiles.max()) > version
+
+    def remember(self, key: str, roi, verdict):
+        """记录 key 在当前版本、该 ROI 下得出的结论"""
+        with self._lock:
+            self._verdicts[key] = (self.version, tuple(roi), verdict)
+
+    def lookup(self, key: str, roi) -> tuple[bool, object]:
+        """
+        查询 key 上一次的结论
+
+        Returns:
+            (是否可沿用, 上一次的结论)；ROI 变化过或没有记录时为 (False, None)
+        """
+        entry = self._verdicts.get(key)
+        if entry is None or entry[1] != tuple(roi):
+            return False, None
+        if self.changed_since(roi, entry[0]):
+            return False, None
+        return True, entry[2]
+
+    def forget(self, key: str | None = None):
+        """清除 key 的结论，key 为 None 时全部清除"""
+        with self._lock:
+            if key is None:
+                self._verdicts.clear()
+            else:
+                self._verdicts.pop(key, None)
+
+
+dirty_regions = DirtyRegionTracker()
@@ -0,0 +1,41 @@
+"""
+帧哈希
+该文件的作用为：
+对截图计算廉价的感知哈希（dHash），用于判断两帧画面是否基本相同。
+"""
+
+import numpy
+
+# 计算哈希前的降采样步长（1280x720 -> 320x180）
+_SAMPLE_STEP = 4
+
+
+def dhash(image: numpy.ndarray, size: int = 8) -> int:
+    """
+    计算图像的差值哈希（size*size 位）
+
+    先按步长降采样，再划分为 size x (size+1) 个块求平均亮度，
+    比较相邻块得到每一位。对轻微噪声不敏感，计算量很小。
+    """
+    small = image[::_SAMPLE_STEP, ::_SAMPLE_STEP]
+    if small.ndim == 3:
+        gray = small.sum(axis=2, dtype=numpy.uint32)
+    else:
+        gray = small.astype(numpy.uint32)
+
+    height, width = gray.shape
+    rows = numpy.linspace(0, height, size + 1, dtype=int)
+    cols = numpy.linspace(0, width, size + 2, dtype=int)
+    blocks = numpy.add.reduceat(
+        numpy.add.reduceat(gray, rows[:-1], axis=0), cols[:-1], axis=1
+    )
+    # 各块像素数可能相差一行/一列，按面积归一化
+    means = blocks / numpy.outer(numpy.diff(rows), numpy.diff(cols))
+
+    bits = means[:, 1:] > means[:, :-1]
+    return int.from_bytes(numpy.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """两个哈希之间不同的位数"""
+    return bin(a ^ b).count("1")
@@ -0,0 +1,120 @@
+"""
+故障帧记录
+该文件的作用为：
+在预分配的 NumPy 环形缓冲区中保留最近 N 帧画面（含时间戳与节点名），
+正常运行时不产生任何磁盘写入；节点识别超时、任务失败、执行 StopTask 节点
+或流水线调用 FlushFrames 动作（用于 on_error）时，才把缓冲区写入磁盘用于事后分析。
+
+配置文件 ./config/frame_recorder.json（第一次使用时读取，save_dir 相对于项目根目录）:
+{
+    "enabled": false,
+    "capacity": 30,
+    "save_dir": "debug/frames"
+}
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+import numpy
+
+from utils.logger import logger
+from utils.config import LazyInstance, project_path, read_agent_config
+from utils.screenshot_writer import save_image, screenshot_writer
+
+
+class FrameRecorder:
+    """
+    固定容量的帧环形缓冲区。
+
+    缓冲区在收到第一帧时按其尺寸分配，之后每帧只做一次 copyto；
+    分辨率变化时重新分配并清空。
+    """
+
+    def __init__(self, capacity: int = 30, save_dir: str = "debug/frames", enabled: bool = True):
+        self.capacity = max(1, capacity)
+        self.save_dir = save_dir
+        self.enabled = enabled
+        self._frames: numpy.ndarray | None = None
+        self._timestamps = numpy.zeros(self.capacity, dtype=numpy.float64)
+        self._nodes: list[str] = [""] * self.capacity
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def record(self, frame: numpy.ndarray | None, node: str):
+        """写入一帧（覆盖最旧的帧）"""
+        if not self.enabled or frame is None or frame.size == 0:
+            return
+        with self._lock:
+            if self._frames is None or self._frames.shape[1:] != frame.shape:
+                self._frames = numpy.empty((self.capacity, *frame.shape), dtype=frame.dtype)
+                self._next = self._size = 0
+            numpy.copyto(self._frames[self._next], frame)
+            self._timestamps[self._next] = time.time()
+            self._nodes[self._next] = node
+            self._next = (self._next + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def snapshot(self) -> list[tuple[float, str, numpy.ndarray]]:
+        """按时间从旧到新复制出缓冲区中的帧"""
+        with self._lock:
+            if not self._size:
+                return []
+            start = (self._next - self._size) % self.capacity
+            order = [(start + i) % self.capacity for i in range(self._size)]
+            return [
+                (float(self._timestamps[i]), self._nodes[i], self._frames[i].copy())
+                for i in order
+            ]
+
+    def clear(self):
+        with self._lock:
+            self._next = self._size = 0
+
+    def flush(self, reason: str, node: str = "") -> str | None:
+        """
+        把缓冲区中的帧写入 save_dir/<时间>_<原因>/ 并清空缓冲区
+
+        Returns:
+            输出目录，缓冲区为空时返回 None
+        """
+        frames = self.snapshot()
+        if not frames:
+            return None
+        self.clear()
+
+        now = datetime.now().strftime("%Y.%m.%d-%H.%M.%S")
+        output_dir = os.path.join(self.save_dir, f"{now}_{reason}")
+        index = {"reason": reason, "node": node, "frames": []}
+        for i, (timestamp, frame_node, frame) in enumerate(frames):
+            file_name = f"{i:03d}.png"
+            index["frames"].append(
+                {"file": file_name, "time": timestamp, "node": frame_node}
+            )
+            screenshot_writer.submit(save_image, frame, os.path.join(output_dir, file_name))
+
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, "index.json"), "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=4, ensure_ascii=False)
+
+        logger.info(f"已保存故障前 {len(frames)} 帧至 {output_dir}（原因: {reason} {node}）")
+        return output_dir
+
+
+def _load_frame_recorder() -> FrameRecorder:
+    config = read_agent_config(
+        "frame_recorder",
+        {"enabled": False, "capacity": 30, "save_dir": "debug/frames"},
+    )
+    return FrameRecorder(
+        capacity=config["capacity"],
+        save_dir=str(project_path(config["save_dir"])),
+        enabled=config["enabled"],
+    )
+
+
+frame_recorder = LazyInstance(_load_frame_recorder)
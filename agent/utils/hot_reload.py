@@ -0,0 +1,135 @@
+"""
+自定义动作热重载（开发模式）
+该文件的作用为：
+轮询 custom.json 中登记的自定义动作/识别源文件，文件修改后只重新加载对应模块，
+并把其中的类重新注册到 AgentServer，无需重启 agent。
+"""
+
+import sys
+import json
+import time
+import importlib
+import threading
+from pathlib import Path
+
+from utils.logger import logger
+
+
+class ActionHotReloader:
+    """
+    监听自定义动作源文件并增量重载。
+
+    custom.json 格式:
+    {
+        "Count": {
+            "type": "action",
+            "class": "Count",
+            "file_path": "{agent_path}/custom/action/Count.py"
+        }
+    }
+    """
+
+    def __init__(self, agent_dir: Path, interval: float = 1.0):
+        self.agent_dir = Path(agent_dir)
+        self.interval = interval
+        # 模块名 -> [(注册名, 类名, 类型)]
+        self._entries: dict[str, list[tuple[str, str, str]]] = {}
+        # 模块名 -> (文件路径, mtime)
+        self._files: dict[str, tuple[Path, float]] = {}
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._load_entries()
+
+    def _load_entries(self):
+        with open(self.agent_dir / "custom.json", "r", encoding="utf-8") as f:
+            custom = json.load(f)
+
+        for name, entry in custom.items():
+            file_path = Path(
+                entry["file_path"].replace("{agent_path}", str(self.agent_dir))
+            )
+            try:
+                relative = file_path.resolve().relative_to(self.agent_dir.resolve())
+            except ValueError:
+                logger.debug(f"{name} 不在 agent 目录内，跳过热重载")
+                continue
+            module_name = ".".join(relative.with_suffix("").parts)
+            self._entries.setdefault(module_name, []).append(
+                (name, entry["class"], entry.get("type", "action"))
+            )
+            if module_name not in self._files and file_path.exists():
+                self._files[module_name] = (file_path, file_path.stat().st_mtime)
+
+    def poll_once(self) -> list[str]:
+        """检查一次文件变化，返回本次重载的模块名"""
+        reloaded = []
+        for module_name, (file_path, mtime) in list(self._files.items()):
+            try:
+                current_mtime = file_path.stat().st_mtime
+            except OSError:
+                continue
+            if current_mtime == mtime:
+                continue
+            self._files[module_name] = (file_path, current_mtime)
+            if self._reload(module_name):
+                reloaded.append(module_name)
+        return reloaded
+
+    def _reload(self, module_name: str) -> bool:
+        from maa.agent.agent_server import AgentServer
+
+        start = time.perf_counter()
+        try:
+            module = sys.modules.get(module_name)
+            if module is None:
+                module = importlib.import_module(module_name)
+            else:
+                module = importlib.reload(module)
+        except Exception:
+            # 保留旧的注册，修正代码后再次保存即可重试
+            logger.exception(f"重载 {module_name} 失败，继续使用旧版本")
+            return False
+
+        # 参数表可能随代码变化，丢弃旧的解析结果
+        from utils.action_param import clear_cache
+
+        clear_cache()
+
+        for name, class_name, entry_type in self._entries[module_name]:
+            cls = getattr(module, class_name, None)
+            if cls is None:
+                logger.error(f"{module_name} 中未找到 {class_name}，{name} 未重新注册")
+                continue
+            if entry_type == "recognition":
+                AgentServer.register_custom_recognition(name, cls())
+            else:
+                AgentServer.register_custom_action(name, cls())
+
+        elapsed = (time.perf_counter() - start) * 1000
+        names = [name for name, _, _ in self._entries[module_name]]
+        logger.info(f"已热重载 {module_name}: {names}，耗时 {elapsed:.1f} ms")
+        return True
+
+    def _watch(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception("热重载检查失败")
+
+    def start(self):
+        """在后台线程中开始监听"""
+        if self._thread is not None:
+            return
+        logger.info(f"热重载已开启，监听 {len(self._files)} 个文件")
+        self._thread = threading.Thread(
+            target=self._watch, name="ActionHotReloader", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """停止监听"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
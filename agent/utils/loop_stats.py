@@ -0,0 +1,140 @@
+"""
+循环吞吐统计
+该文件的作用为：
+以 (task_id, 节点名) 为键记录每次循环的时间戳，计算每小时循环次数、
+单次循环耗时的 p50/p95/最大值以及到达目标次数的预计剩余时间。
+Count 在播报时输出这些数据，其他动作也可以通过 loop_stats.summary 查询。
+"""
+
+import time
+import threading
+from collections import deque, OrderedDict
+
+
+class _NodeLoop:
+    """单个节点的循环记录"""
+
+    def __init__(self, max_samples: int):
+        self.first_tick: float | None = None
+        self.last_tick: float | None = None
+        self.iterations = 0
+        self.intervals: deque[float] = deque(maxlen=max_samples)
+
+    def tick(self, now: float):
+        if self.last_tick is not None:
+            self.intervals.append(now - self.last_tick)
+        else:
+            self.first_tick = now
+        self.last_tick = now
+        self.iterations += 1
+
+
+def _percentile(sorted_values: list[float], ratio: float) -> float:
+    """最近秩法百分位数"""
+    index = max(0, min(len(sorted_values) - 1, round(ratio * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class LoopStats:
+    """
+    循环统计注册表。
+
+    每个节点保留最近 max_samples 次循环间隔用于计算百分位数，
+    仅保留最近 max_tasks 个任务的记录。
+    """
+
+    def __init__(self, max_samples: int = 1000, max_tasks: int = 16):
+        self.max_samples = max_samples
+        self.max_tasks = max_tasks
+        self._tasks: OrderedDict[int, dict[str, _NodeLoop]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _task(self, task_id: int) -> dict[str, _NodeLoop]:
+        loops = self._tasks.get(task_id)
+        if loops is None:
+            loops = self._tasks[task_id] = {}
+            while len(self._tasks) > self.max_tasks:
+                self._tasks.popitem(last=False)
+        else:
+            self._tasks.move_to_end(task_id)
+        return loops
+
+    def tick(self, task_id: int, node: str):
+        """记录一次循环"""
+        now = time.monotonic()
+        with self._lock:
+            loops = self._task(task_id)
+            loop = loops.get(node)
+            if loop is None:
+                loop = loops[node] = _NodeLoop(self.max_samples)
+            loop.tick(now)
+
+    def reset(self, task_id: int, nodes: str | list | tuple):
+        """清除节点的循环记录（计数被重置时调用）"""
+        if isinstance(nodes, str):
+            nodes = [nodes]
+        with self._lock:
+            loops = self._tasks.get(task_id, {})
+            for node in nodes:
+                loops.pop(node, None)
+
+    def summary(self, task_id: int, node: str, current_count: int = 0, target_count: int = 0) -> dict | None:
+        """
+        返回节点的循环统计，无记录时返回 None
+
+        Returns:
+            {
+                "iterations": 记录的循环次数,
+                "elapsed_seconds": 首次到最近一次循环的时间,
+                "per_hour": 每小时循环次数,
+                "p50_seconds"/"p95_seconds"/"max_seconds": 单次循环耗时,
+                "eta_seconds": 到达 target_count 的预计剩余时间（target_count 为 0 时为 None）
+            }
+        """
+        with self._lock:
+            loop = self._tasks.get(task_id, {}).get(node)
+            if loop is None or loop.last_tick is None:
+                return None
+            intervals = sorted(loop.intervals)
+            iterations = loop.iterations
+            elapsed = loop.last_tick - loop.first_tick
+
+        result = {
+            "iterations": iterations,
+            "elapsed_seconds": elapsed,
+            "per_hour": None,
+            "p50_seconds": None,
+            "p95_seconds": None,
+            "max_seconds": None,
+            "eta_seconds": None,
+        }
+        if not intervals:
+            return result
+
+        mean = sum(intervals) / len(intervals)
+        result.update(
+            per_hour=3600 / mean if mean > 0 else None,
+            p50_seconds=_percentile(intervals, 0.5),
+            p95_seconds=_percentile(intervals, 0.95),
+            max_seconds=intervals[-1],
+        )
+        if target_count > 0:
+            result["eta_seconds"] = max(0, target_count - current_count) * mean
+        return result
+
+    def format_summary(self, summary: dict | None) -> str:
+        """把 summary 转为播报用的简短文本"""
+        if not summary or summary["per_hour"] is None:
+            return ""
+        text = (
+            f"{summary['per_hour']:.1f}次/小时，单次耗时 p50 {summary['p50_seconds']:.1f}s"
+            f" / p95 {summary['p95_seconds']:.1f}s / 最大 {summary['max_seconds']:.1f}s"
+        )
+        if summary["eta_seconds"] is not None:
+            minutes, seconds = divmod(int(summary["eta_seconds"]), 60)
+            hours, minutes = divmod(minutes, 60)
+            text += f"，预计剩余 {hours}:{minutes:02d}:{seconds:02d}"
+        return text
+
+
+loop_stats = LoopStats()
@@ -0,0 +1,98 @@
+"""
+批量流水线覆盖
+该文件的作用为：
+在一次动作中收集多个节点的覆盖内容，合并后只调用一次 context.override_pipeline，
+并记录被跳过的覆盖及原因。
+"""
+
+import copy
+
+from utils.logger import logger
+from utils.recognition_cache import recognition_cache
+
+
+def _deep_merge(target: dict, patch: dict) -> dict:
+    """把 patch 递归合并进 target，非字典值直接覆盖；嵌套的值会被复制，之后的合并不会修改 patch"""
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _deep_merge(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+    return target
+
+
+class OverrideBatch:
+    """
+    收集节点覆盖并一次性提交。
+
+    用法:
+        with OverrideBatch(context) as batch:
+            batch.add("节点A", {"enabled": False})
+            batch.add("节点B", {"custom_action_param": {...}})
+        # 退出 with 时提交；发生异常时不提交
+
+    同一节点多次 add 会按顺序深度合并，后加入的值优先。
+    """
+
+    def __init__(self, context, name: str = ""):
+        self.context = context
+        self.name = name
+        self._patches: dict[str, dict] = {}
+        self.skipped: list[tuple[str, str]] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        return False
+
+    def __len__(self):
+        return len(self._patches)
+
+    def add(self, node, patch) -> bool:
+        """加入一个节点的覆盖，参数不合法时记为跳过并返回 False"""
+        if not isinstance(node, str) or not node:
+            self.skip(str(node), "节点名不是非空字符串")
+            return False
+        if not isinstance(patch, dict):
+            self.skip(node, f"覆盖内容不是字典: {type(patch).__name__}")
+            return False
+        if not patch:
+            self.skip(node, "覆盖内容为空")
+            return False
+
+        _deep_merge(self._patches.setdefault(node, {}), patch)
+        return True
+
+    def add_many(self, overrides) -> int:
+        """加入 {节点名: 覆盖内容} 形式的多个覆盖，返回成功加入的数量"""
+        if not isinstance(overrides, dict):
+            self.skip("", f"覆盖集合不是字典: {type(overrides).__name__}")
+            return 0
+        return sum(self.add(node, patch) for node, patch in overrides.items())
+
+    def skip(self, node: str, reason: str):
+        """记录一个被跳过的覆盖"""
+        self.skipped.append((node, reason))
+
+    def commit(self) -> bool:
+        """合并所有覆盖并调用一次 override_pipeline"""
+        prefix = f"{self.name}: " if self.name else ""
+        for node, reason in self.skipped:
+            logger.warning(f"{prefix}跳过节点 {node} 的覆盖，原因: {reason}")
+
+        if not self._patches:
+            return True
+
+        patches, self._patches = self._patches, {}
+        logger.debug(f"{prefix}提交 {len(patches)} 个节点的覆盖: {list(patches)}")
+        success = self.context.override_pipeline(patches)
+        # 识别结果缓存中的节点配置已过期
+        if recognition_cache.loaded:
+            recognition_cache.invalidate(patches)
+        if success is False:
+            logger.error(f"{prefix}override_pipeline 失败: {list(patches)}")
+            return False
+        return True
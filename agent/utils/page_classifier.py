@@ -0,0 +1,118 @@
+"""
+页面识别
+该文件的作用为：
+一次调用判断当前处于哪个页面，代替各导航节点中重复的 Or 识别树
+（角色面板_图标、返回_图标、关闭_图标1/2、放弃挑战图标与"放弃挑战"文字）。
+页面树定义在 pipeline/UI/page.json 的"页面识别"节点中：一个原生 Or，分支"页面识别-<页面>"
+按优先级排列，模板、ROI 与默认阈值与原识别树相同。
+整棵树经 recognition_cache 由一次 context.run_recognition 执行，画面逐像素相同时直接返回上一次的结果；
+命中的页面取自 Or 结果中命中的分支。
+"""
+
+import numpy
+from maa.context import Context
+
+from utils.recognition_cache import recognition_cache
+
+# 页面树节点名与分支节点名前缀
+PAGE_TREE = "页面识别"
+_BRANCH_PREFIX = f"{PAGE_TREE}-"
+
+# 与"页面识别"节点的 any_of 顺序一致
+PAGES = ("主页面", "二级页面", "弹窗", "局内", "委托结束")
+
+# 使用 TemplateMatch 的分支，threshold 参数作用于这些分支
+_TEMPLATE_PAGES = ("主页面", "二级页面", "弹窗", "局内")
+_OCR_PAGE = "委托结束"
+
+_DEFAULT_THRESHOLD = 0.7
+
+
+def _score(reco_detail) -> float:
+    """识别结果中最佳结果的得分，没有时为 0"""
+    best = getattr(reco_detail, "best_result", None)
+    score = getattr(best, "score", None)
+    return float(score) if score is not None else 0.0
+
+
+class PageClassifier:
+    """
+    页面分类器。
+
+    classify() 返回 (页面, 得分, 命中区域)；未识别到任何页面时页面为 None。
+    最近一次的结果保存在 last_page 中。
+    """
+
+    def __init__(self, threshold: float = _DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.last_page: str | None = None
+        # (threshold, pages, ocr_expected) -> pipeline_override
+        self._overrides: dict[tuple, dict | None] = {}
+
+    def classify(
+        self,
+        context: Context,
+        image: numpy.ndarray,
+        threshold: float | None = None,
+        pages: tuple[str, ...] = (),
+        ocr_expected: tuple[str, ...] = (),
+    ) -> tuple[str | None, float, tuple[int, int, int, int] | None]:
+        """
+        Args:
+            image: 当前画面（BGR）
+            threshold: TemplateMatch 阈值，默认 0.7（与 TemplateMatch 默认值相同）
+            pages: 只检查这些页面，为空时检查全部
+            ocr_expected: 替换"委托结束"分支的期望文字，为空时使用默认值
+        """
+        threshold = self.threshold if threshold is None else threshold
+        override = self._override(threshold, tuple(pages), tuple(ocr_expected))
+        reco_detail = recognition_cache.run(context, PAGE_TREE, image, override)
+
+        page, score, box = self._verdict(reco_detail)
+        self.last_page = page
+        return page, score, box
+
+    def _override(
+        self, threshold: float, pages: tuple[str, ...], ocr_expected: tuple[str, ...]
+    ) -> dict | None:
+        """按本次调用的参数生成页面树的 override，默认参数时为 None；结果按参数缓存"""
+        key = (threshold, pages, ocr_expected)
+        if key in self._overrides:
+            return self._overrides[key]
+
+        override = {}
+        if pages:
+            any_of = [f"{_BRANCH_PREFIX}{page}" for page in PAGES if page in pages]
+            override[PAGE_TREE] = {"recognition": {"param": {"any_of": any_of}}}
+        if threshold != _DEFAULT_THRESHOLD:
+            for page in _TEMPLATE_PAGES:
+                override[f"{_BRANCH_PREFIX}{page}"] = {
+                    "recognition": {"param": {"threshold": threshold}}
+                }
+        if ocr_expected:
+            override[f"{_BRANCH_PREFIX}{_OCR_PAGE}"] = {
+                "recognition": {"param": {"expected": list(ocr_expected)}}
+            }
+
+        self._overrides[key] = override or None
+        return self._overrides[key]
+
+    @staticmethod
+    def _verdict(reco_detail) -> tuple[str | None, float, tuple[int, int, int, int] | None]:
+        """从 Or 的识别结果中取出命中的分支，返回 (页面, 得分, 命中区域)"""
+        if reco_detail is None:
+            return None, 0.0, None
+
+        sub_results = getattr(reco_detail.best_result, "sub_results", None) or []
+        best_score = 0.0
+        for sub_detail in sub_results:
+            score = _score(sub_detail)
+            if sub_detail.hit and sub_detail.box is not None:
+                box = sub_detail.box
+                page = sub_detail.name.removeprefix(_BRANCH_PREFIX)
+                return page, score, (box.x, box.y, box.w, box.h)
+            best_score = max(best_score, score)
+        return None, best_score, None
+
+
+page_classifier = PageClassifier()
@@ -0,0 +1,184 @@
+"""
+并行识别
+该文件的作用为：
+把 Or 节点中相互独立的子识别（通常各自看不同的 ROI）交给线程池同时执行，
+返回第一个命中的结果（first）或按顺序优先级最高的命中结果（priority），并取消尚未开始的子识别。
+每次调用记录按顺序执行时的预计耗时与实际耗时之差，即并行节省的时间。
+
+已经开始的子识别无法中途打断，会在后台执行完毕后被丢弃。
+嵌套调用（子识别本身也是 ParallelAny，或上一次调用的子识别仍在执行）时在当前线程中按顺序识别，
+避免线程池的工作线程都在等待彼此的结果而死锁。
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy
+from maa.context import Context
+
+from utils.recognition_cache import recognition_cache
+
+FIRST = "first"
+PRIORITY = "priority"
+
+# 线程池工作线程的标记
+_worker = threading.local()
+
+
+def _mark_worker():
+    _worker.in_pool = True
+
+
+class ParallelRecognizer:
+    """
+    并行子识别调度器。
+
+    用法:
+        node, reco_detail, timing = parallel_recognizer.run(context, image, ["A", "B", "C"])
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        # 至少 2 个线程，单核机器上也能并行等待
+        self.max_workers = max(2, max_workers or min(8, os.cpu_count() or 1))
+        self.calls = 0
+        self.inline_calls = 0
+        self.saved_seconds = 0.0
+        self._executor: ThreadPoolExecutor | None = None
+        self._outstanding = 0
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="ParallelAny",
+                        initializer=_mark_worker,
+                    )
+        return self._executor
+
+    def _enter(self, count: int) -> bool:
+        """登记 count 个子识别；嵌套调用时返回 False，由调用方在当前线程中识别"""
+        with self._lock:
+            if getattr(_worker, "in_pool", False) or self._outstanding:
+                self.inline_calls += 1
+                return False
+            self._outstanding += count
+            return True
+
+    def _finished(self, _future):
+        with self._lock:
+            self._outstanding -= 1
+
+    def _run_inline(
+        self, context: Context, image: numpy.ndarray, nodes, cache: bool
+    ) -> tuple[str | None, object, dict]:
+        """按顺序识别，第一个命中即返回（与 Or 相同）"""
+        start = time.perf_counter()
+        for node in nodes:
+            reco_detail, _ = self._recognize(context, node, image, cache)
+            if reco_detail is not None and reco_detail.hit:
+                break
+        else:
+            node, reco_detail = None, None
+        elapsed = round((time.perf_counter() - start) * 1000, 2)
+        timing = {"elapsed_ms": elapsed, "sequential_ms": elapsed, "saved_ms": 0.0}
+        return node, reco_detail, timing
+
+    def _recognize(self, context: Context, node: str, image: numpy.ndarray, cache: bool):
+        start = time.perf_counter()
+        # 每个子识别使用独立的 context，避免并发修改同一个 context
+        sub_context = context.clone()
+        if cache:
+            reco_detail = recognition_cache.run(sub_context, node, image)
+        else:
+            reco_detail = sub_context.run_recognition(node, image)
+        return reco_detail, time.perf_counter() - start
+
+    def run(
+        self,
+        context: Context,
+        image: numpy.ndarray,
+        nodes: list[str] | tuple[str, ...],
+        mode: str = FIRST,
+        cache: bool = True,
+    ) -> tuple[str | None, object, dict]:
+        """
+        并行执行子识别
+
+        Args:
+            nodes: 子识别节点名，顺序即优先级
+            mode: first 返回最先命中的结果，priority 返回顺序最靠前的命中结果
+            cache: 子识别是否经过 recognition_cache
+
+        Returns:
+            (命中的节点名, RecognitionDetail, 耗时统计)，未命中时前两项为 None
+        """
+        if not self._enter(len(nodes)):
+            return self._run_inline(context, image, nodes, cache)
+
+        start = time.perf_counter()
+        pool = self._pool()
+        futures = [pool.submit(self._recognize, context, node, image, cache) for node in nodes]
+        for future in futures:
+            future.add_done_callback(self._finished)
+        durations: list[float | None] = [None] * len(nodes)
+        hit_index = None
+        hit_detail = None
+
+        def collect(index: int) -> bool:
+            reco_detail, duration = futures[index].result()
+            durations[index] = duration
+            return reco_detail is not None and reco_detail.hit
+
+        if mode == PRIORITY:
+            for index in range(len(futures)):
+                if collect(index):
+                    hit_index = index
+                    break
+        else:
+            pending = set(range(len(futures)))
+            index_of = {future: index for index, future in enumerate(futures)}
+            while pending and hit_index is None:
+                done, _ = wait([futures[index] for index in pending], return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=index_of.get):
+                    index = index_of[future]
+                    pending.discard(index)
+                    if collect(index) and hit_index is None:
+                        hit_index = index
+
+        for future in futures:
+            future.cancel()
+        if hit_index is not None:
+            hit_detail = futures[hit_index].result()[0]
+
+        elapsed = time.perf_counter() - start
+        # 顺序执行 Or 时会依次识别到命中的分支为止；只统计已知耗时，得到的是保守估计
+        checked = durations if hit_index is None else durations[: hit_index + 1]
+        sequential = sum(duration for duration in checked if duration is not None)
+        saved = max(0.0, sequential - elapsed)
+        with self._lock:
+            self.calls += 1
+            self.saved_seconds += saved
+
+        timing = {
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "sequential_ms": round(sequential * 1000, 2),
+            "saved_ms": round(saved * 1000, 2),
+        }
+        node = nodes[hit_index] if hit_index is not None else None
+        return node, hit_detail, timing
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "inline_calls": self.inline_calls,
+            "saved_ms": round(self.saved_seconds * 1000, 2),
+            "avg_saved_ms": round(self.saved_seconds * 1000 / self.calls, 2) if self.calls else 0.0,
+        }
+
+
+parallel_recognizer = ParallelRecognizer()
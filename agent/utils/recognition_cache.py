@@ -0,0 +1,190 @@
+"""
+识别结果缓存
+该文件的作用为：
+缓存自定义识别中 context.run_recognition 的结果。
+键为 (节点名, 生效的节点配置, ROI 区域像素哈希)：画面在 ROI 内逐像素相同、
+节点配置也未变化时，直接返回上一次的识别结果，例如 post_delay 期间反复检查静止画面。
+采用 LRU 淘汰，并记录命中/未命中次数。
+节点配置按节点名缓存（含序列化结果），查询时不经 IPC 读取节点；
+节点被 override 后需调用 invalidate（OverrideBatch 提交与任务开始时会自动调用）。
+
+注意：命中时返回的是上一次的 RecognitionDetail（reco_id 相同），
+依赖识别副作用（如 Custom 识别中的点击）的节点不应使用此缓存。
+
+配置文件 ./config/recognition_cache.json（第一次使用时读取）:
+{
+    "enabled": true,
+    "max_entries": 512
+}
+"""
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy
+from maa.context import Context
+
+from utils.config import LazyInstance, read_agent_config
+
+# 识别结果依赖多个区域或子节点，无法按单个 ROI 判定，改为哈希整幅画面
+_COMPOSITE_TYPES = ("And", "Or", "Custom")
+
+
+def _effective_node(data: dict, override: dict | None) -> dict:
+    """节点配置叠加本次调用的 override（浅合并 recognition.param）"""
+    if not override:
+        return data
+
+    merged = {**data, **override}
+    recognition = data.get("recognition")
+    override_recognition = override.get("recognition")
+    if isinstance(recognition, dict) and isinstance(override_recognition, dict):
+        merged["recognition"] = {
+            **recognition,
+            **override_recognition,
+            "param": {
+                **recognition.get("param", {}),
+                **override_recognition.get("param", {}),
+            },
+        }
+    return merged
+
+
+def _roi_of(node_data: dict, image: numpy.ndarray) -> tuple[int, int, int, int] | None:
+    """返回节点识别使用的 ROI（已加上 roi_offset 并裁剪到画面内），无法确定时返回 None"""
+    recognition = node_data.get("recognition")
+    if not isinstance(recognition, dict) or recognition.get("type") in _COMPOSITE_TYPES:
+        return None
+    param = recognition.get("param", {})
+    roi = param.get("roi", [0, 0, 0, 0])
+    if not isinstance(roi, list) or len(roi) != 4:
+        return None
+
+    offset = param.get("roi_offset", [0, 0, 0, 0])
+    x, y, w, h = (a + b for a, b in zip(roi, offset))
+    height, width = image.shape[:2]
+    if w <= 0 or h <= 0:
+        return 0, 0, width, height
+    left, top = max(0, x), max(0, y)
+    right, bottom = min(width, x + w), min(height, y + h)
+    if right <= left or bottom <= top:
+        return None
+    return left, top, right - left, bottom - top
+
+
+def region_hash(image: numpy.ndarray, roi: tuple[int, int, int, int] | None = None) -> bytes:
+    """画面（或其中 ROI 区域）像素的 64 位哈希"""
+    if roi is not None:
+        x, y, w, h = roi
+        image = image[y : y + h, x : x + w]
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(repr(image.shape).encode())
+    digest.update(numpy.ascontiguousarray(image).data)
+    return digest.digest()
+
+
+class RecognitionCache:
+    """
+    run_recognition 的 LRU 缓存。
+
+    用法:
+        reco_detail = recognition_cache.run(context, "关闭_图标1", argv.image)
+    """
+
+    def __init__(self, max_entries: int = 512, enabled: bool = True):
+        self.max_entries = max(1, max_entries)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, object] = OrderedDict()
+        # 节点名 -> (节点配置, 序列化后的节点配置)
+        self._nodes: dict[str, tuple[dict, str]] = {}
+        self._lock = threading.Lock()
+
+    def _node(self, context: Context, node: str) -> tuple[dict, str]:
+        cached = self._nodes.get(node)
+        if cached is None:
+            data = context.get_node_data(node) or {}
+            cached = (data, json.dumps(data, sort_keys=True, ensure_ascii=False))
+            self._nodes[node] = cached
+        return cached
+
+    def invalidate(self, nodes=None):
+        """丢弃缓存的节点配置，节点被 override 后调用；nodes 为 None 时全部丢弃"""
+        with self._lock:
+            if nodes is None:
+                self._nodes.clear()
+            else:
+                for node in nodes:
+                    self._nodes.pop(node, None)
+
+    def key(
+        self,
+        context: Context,
+        node: str,
+        image: numpy.ndarray,
+        pipeline_override: dict | None = None,
+    ) -> tuple:
+        node_data, config_key = self._node(context, node)
+        if pipeline_override:
+            node_data = _effective_node(node_data, pipeline_override.get(node))
+            override_key = json.dumps(pipeline_override, sort_keys=True, ensure_ascii=False)
+        else:
+            override_key = ""
+        return node, config_key, override_key, region_hash(image, _roi_of(node_data, image))
+
+    def run(
+        self,
+        context: Context,
+        node: str,
+        image: numpy.ndarray,
+        pipeline_override: dict | None = None,
+    ):
+        """与 context.run_recognition 相同，画面与配置未变化时返回缓存的结果"""
+        if not self.enabled:
+            return context.run_recognition(node, image, pipeline_override or {})
+
+        key = self.key(context, node, image, pipeline_override)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        reco_detail = context.run_recognition(node, image, pipeline_override or {})
+
+        with self._lock:
+            self._entries[key] = reco_detail
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return reco_detail
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate(),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nodes.clear()
+            self.hits = self.misses = 0
+
+
+def _load_recognition_cache() -> RecognitionCache:
+    default_config = {"enabled": True, "max_entries": 512}
+    config = read_agent_config("recognition_cache", default_config)
+    return RecognitionCache(max_entries=config["max_entries"], enabled=config["enabled"])
+
+
+recognition_cache = LazyInstance(_load_recognition_cache)
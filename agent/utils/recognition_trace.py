@@ -0,0 +1,103 @@
+"""
+识别命中统计
+该文件的作用为：
+统计每个节点的识别次数、命中次数与累计耗时，定期写入 JSON 文件，
+跨多次运行累计，供 tools/reorder_pipeline.py 按实际命中率调整 next 与 Or 分支顺序。
+文件格式与 tools/replay_task.py 的回放报告一致：
+{"recognitions": {节点名: {"calls": 次数, "hits": 命中次数, "total_ms": 累计耗时}}}
+
+配置文件 ./config/recognition_trace.json（第一次使用时读取，path 相对于项目根目录）:
+{
+    "enabled": false,
+    "path": "debug/recognition_stats.json",
+    "flush_interval": 200
+}
+"""
+
+import os
+import json
+import atexit
+import threading
+
+from utils.logger import logger
+from utils.config import LazyInstance, project_path, read_agent_config
+
+
+class RecognitionTrace:
+    """节点识别统计，record() 只更新内存，每 flush_interval 次写一次文件"""
+
+    def __init__(
+        self,
+        path: str = "debug/recognition_stats.json",
+        flush_interval: int = 200,
+        enabled: bool = True,
+    ):
+        self.path = path
+        self.flush_interval = max(1, flush_interval)
+        self.enabled = enabled
+        self._stats: dict[str, dict] = {}
+        self._pending = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """读取之前运行累计的统计"""
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._stats = json.load(f).get("recognitions", {})
+        except Exception:
+            logger.exception(f"读取识别统计 {self.path} 失败，重新开始统计")
+            self._stats = {}
+
+    def record(self, node: str, hit: bool, duration: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            stats = self._stats.setdefault(node, {"calls": 0, "hits": 0, "total_ms": 0.0})
+            stats["calls"] += 1
+            stats["hits"] += int(hit)
+            stats["total_ms"] = round(stats["total_ms"] + duration * 1000, 3)
+            self._pending += 1
+            if self._pending >= self.flush_interval:
+                self._write()
+
+    def _write(self):
+        self._pending = 0
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"recognitions": self._stats}, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self._write()
+
+
+def _load_recognition_trace() -> RecognitionTrace:
+    default_config = {
+        "enabled": False,
+        "path": "debug/recognition_stats.json",
+        "flush_interval": 200,
+    }
+    config = read_agent_config("recognition_trace", default_config)
+    return RecognitionTrace(
+        path=str(project_path(config["path"])),
+        flush_interval=config["flush_interval"],
+        enabled=config["enabled"],
+    )
+
+
+def _flush_at_exit():
+    if recognition_trace.loaded:
+        recognition_trace.flush()
+
+
+recognition_trace = LazyInstance(_load_recognition_trace)
+atexit.register(_flush_at_exit)
@@ -0,0 +1,210 @@
+"""
+离线回放控制器
+该文件的作用为：
+以录制的画面代替真实设备，供 Tasker 在没有模拟器的环境中运行流水线。
+画面来源可以是截图目录（.png/.webp/.jpg/.npy，按文件名排序）或 session_recorder 的会话目录；
+点击、滑动等输入按脚本规则切换到指定帧，用于复现识别耗时与节点跳转。
+
+脚本格式（JSON，可选）:
+{
+    "start": 0,
+    "advance_on_input": true,
+    "rules": [
+        {"event": "click", "frames": [0, 5], "roi": [830, 590, 450, 130], "goto": 12},
+        {"event": "start_app", "goto": 0},
+        {"event": "*", "goto": "+1"}
+    ]
+}
+event: click / swipe / touch_down / click_key / input_text / start_app / stop_app / *
+frames: 规则生效的当前帧范围 [起, 止]（含），省略表示任意帧
+roi: 点击/滑动起点需落在的区域 [x, y, w, h]，省略表示任意位置
+goto: 目标帧序号，或 "+N" / "-N" 表示相对当前帧移动
+没有规则匹配时，advance_on_input 为 true 则前进一帧，否则停留在当前帧。
+"""
+
+import os
+import json
+import threading
+from pathlib import Path
+
+import numpy
+from maa.controller import CustomController
+
+from utils.logger import logger
+
+IMAGE_SUFFIXES = (".png", ".webp", ".jpg", ".npy")
+
+
+def _load_image(path: Path) -> numpy.ndarray:
+    """读取截图为 BGR 数组"""
+    if path.suffix == ".npy":
+        return numpy.load(path, allow_pickle=False)
+
+    from PIL import Image
+
+    rgb_array = numpy.asarray(Image.open(path).convert("RGB"))
+    return numpy.ascontiguousarray(rgb_array[:, :, ::-1])
+
+
+class DirectoryFrameSource:
+    """按文件名顺序读取截图目录"""
+
+    def __init__(self, directory: str):
+        self.paths = sorted(
+            path for path in Path(directory).iterdir() if path.suffix.lower() in IMAGE_SUFFIXES
+        )
+        if not self.paths:
+            raise ValueError(f"{directory} 中没有截图")
+
+    def __len__(self):
+        return len(self.paths)
+
+    def frame(self, index: int) -> numpy.ndarray:
+        return _load_image(self.paths[index])
+
+
+class SessionFrameSource:
+    """读取 session_recorder 录制的会话目录"""
+
+    def __init__(self, session_dir: str):
+        from utils.session_recorder import SessionReader
+
+        self.reader = SessionReader(session_dir)
+        self.addresses = [
+            (chunk_index, frame_index)
+            for chunk_index, chunk in enumerate(self.reader.chunks)
+            for frame_index in range(chunk["frames"])
+        ]
+        if not self.addresses:
+            raise ValueError(f"{session_dir} 中没有录制帧")
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def frame(self, index: int) -> numpy.ndarray:
+        return self.reader.decode(*self.addresses[index])
+
+
+def open_frame_source(path: str):
+    """根据路径内容选择帧来源"""
+    if os.path.exists(os.path.join(path, "index.json")):
+        return SessionFrameSource(path)
+    return DirectoryFrameSource(path)
+
+
+class ReplayController(CustomController):
+    """
+    回放控制器。
+
+    screencap 返回当前帧；输入事件按脚本规则切换当前帧，并记录到 events 供分析。
+    """
+
+    def __init__(self, source, script: dict | None = None):
+        super().__init__()
+        self.source = source
+        self.script = script or {}
+        self.rules: list[dict] = self.script.get("rules", [])
+        self.advance_on_input = self.script.get("advance_on_input", True)
+        self.current = int(self.script.get("start", 0))
+        self.events: list[dict] = []
+        self._cache: tuple[int, numpy.ndarray] | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_path(cls, frames_path: str, script_path: str | None = None):
+        script = None
+        if script_path:
+            with open(script_path, "r", encoding="utf-8") as f:
+                script = json.load(f)
+        return cls(open_frame_source(frames_path), script)
+
+    # region 画面
+
+    def connect(self) -> bool:
+        return True
+
+    def request_uuid(self) -> str:
+        return "M2gyro-Replay"
+
+    def screencap(self) -> numpy.ndarray:
+        with self._lock:
+            index = self.current
+            if self._cache is None or self._cache[0] != index:
+                self._cache = (index, self.source.frame(index))
+            return self._cache[1]
+
+    # region 输入
+
+    def _match(self, rule: dict, event: str, point: tuple[int, int] | None) -> bool:
+        if rule.get("event", "*") not in ("*", event):
+            return False
+        frames = rule.get("frames")
+        if frames and not frames[0] <= self.current <= frames[1]:
+            return False
+        roi = rule.get("roi")
+        if roi:
+            if point is None:
+                return False
+            x, y = point
+            if not (roi[0] <= x < roi[0] + roi[2] and roi[1] <= y < roi[1] + roi[3]):
+                return False
+        return True
+
+    def _on_input(self, event: str, point: tuple[int, int] | None = None, **detail) -> bool:
+        with self._lock:
+            previous = self.current
+            target = None
+            for rule in self.rules:
+                if self._match(rule, event, point):
+                    goto = rule.get("goto", "+1")
+                    if isinstance(goto, str):
+                        target = self.current + int(goto)
+                    else:
+                        target = int(goto)
+                    break
+            if target is None and self.advance_on_input:
+                target = self.current + 1
+            if target is not None:
+                self.current = max(0, min(len(self.source) - 1, target))
+
+            self.events.append(
+                {"event": event, "point": point, "from": previous, "to": self.current, **detail}
+            )
+        logger.debug(f"回放输入 {event} {point or ''}: 帧 {previous} -> {self.current}")
+        return True
+
+    def start_app(self, intent: str) -> bool:
+        return self._on_input("start_app", intent=intent)
+
+    def stop_app(self, intent: str) -> bool:
+        return self._on_input("stop_app", intent=intent)
+
+    def click(self, x: int, y: int) -> bool:
+        return self._on_input("click", (x, y))
+
+    def swipe(self, x1: int, y1: int, x2: int, y2: int, duration: int) -> bool:
+        return self._on_input("swipe", (x1, y1), end=(x2, y2), duration=duration)
+
+    def touch_down(self, contact: int, x: int, y: int, pressure: int) -> bool:
+        return self._on_input("touch_down", (x, y), contact=contact)
+
+    def touch_move(self, contact: int, x: int, y: int, pressure: int) -> bool:
+        return True
+
+    def touch_up(self, contact: int) -> bool:
+        return True
+
+    def click_key(self, keycode: int) -> bool:
+        return self._on_input("click_key", keycode=keycode)
+
+    def key_down(self, keycode: int) -> bool:
+        return self._on_input("click_key", keycode=keycode)
+
+    def key_up(self, keycode: int) -> bool:
+        return True
+
+    def input_text(self, text: str) -> bool:
+        return self._on_input("input_text", text=text)
+
+    def scroll(self, dx: int, dy: int) -> bool:
+        return self._on_input("scroll", dx=dx, dy=dy)
@@ -0,0 +1,136 @@
+"""
+截图目录保留策略
+该文件的作用为：
+按最长保留时间与目录总大小清理截图目录中最旧的文件。
+每个目录只在第一次使用时扫描一次，之后由写入方登记新文件，增量维护索引，
+清理与截图写入在同一线程中执行：异步保存时在写入线程中，同步保存时在动作线程中，保证每个文件都会登记。
+重复截图以硬链接保存，同一 inode 的多个文件只计一次大小，删除最后一个链接时才释放空间。
+"""
+
+import os
+import time
+import threading
+from collections import deque
+
+from utils.logger import logger
+
+# 参与清理的截图文件后缀
+SCREENSHOT_SUFFIXES = (".png", ".webp", ".npy", ".jpg")
+
+
+class _DirectoryIndex:
+    """单个目录的文件索引，按修改时间从旧到新排列"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.files: deque[tuple[float, str, int, tuple[int, int]]] = deque()
+        # (st_dev, st_ino) -> 索引中指向该 inode 的文件数
+        self.links: dict[tuple[int, int], int] = {}
+        self.total_bytes = 0
+        self.max_age_seconds = 0.0
+        self.max_total_bytes = 0
+
+    def scan(self):
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.lower().endswith(SCREENSHOT_SUFFIXES):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    if entry.is_file():
+                        entries.append((stat.st_mtime, entry.path, stat.st_size, (stat.st_dev, stat.st_ino)))
+        except FileNotFoundError:
+            return
+        entries.sort()
+        self.files = deque()
+        self.links = {}
+        self.total_bytes = 0
+        for item in entries:
+            self._append(item)
+
+    def _append(self, item: tuple[float, str, int, tuple[int, int]]):
+        _, _, size, inode = item
+        self.files.append(item)
+        links = self.links.get(inode, 0)
+        if not links:
+            self.total_bytes += size
+        self.links[inode] = links + 1
+
+    def add(self, path: str):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        self._append((stat.st_mtime, path, stat.st_size, (stat.st_dev, stat.st_ino)))
+
+    def evict(self) -> tuple[int, int]:
+        """删除超龄或超出总大小的最旧文件，返回 (文件数, 字节数)"""
+        now = time.time()
+        count = reclaimed = 0
+        while self.files:
+            mtime, path, size, inode = self.files[0]
+            too_old = self.max_age_seconds > 0 and now - mtime > self.max_age_seconds
+            too_big = self.max_total_bytes > 0 and self.total_bytes > self.max_total_bytes
+            if not (too_old or too_big):
+                break
+            self.files.popleft()
+            links = self.links.pop(inode, 1) - 1
+            if links:
+                self.links[inode] = links
+            else:
+                self.total_bytes -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            except OSError:
+                logger.debug(f"无法删除旧截图: {path}")
+                continue
+            count += 1
+            if not links:
+                reclaimed += size
+        return count, reclaimed
+
+
+class ScreenshotRetention:
+    """
+    截图保留管理器。
+
+    用法:
+        screenshot_retention.track(save_dir, path, max_age_days=3, max_total_mb=1024)
+    max_age_days / max_total_mb 为 0 表示不限制。
+    """
+
+    def __init__(self):
+        self._indexes: dict[str, _DirectoryIndex] = {}
+        self._lock = threading.Lock()
+
+    def track(self, directory: str, path: str | None = None, max_age_days: float = 3, max_total_mb: float = 0):
+        """登记新写入的截图并按限制清理目录"""
+        key = os.path.abspath(directory)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._indexes[key] = _DirectoryIndex(key)
+                index.scan()
+                logger.debug(
+                    f"截图目录 {directory} 现有 {len(index.files)} 个文件，共 {index.total_bytes / 1024 / 1024:.1f} MB"
+                )
+            elif path is not None:
+                index.add(os.path.abspath(path))
+
+            index.max_age_seconds = max_age_days * 86400
+            index.max_total_bytes = int(max_total_mb * 1024 * 1024)
+            count, reclaimed = index.evict()
+
+        if count:
+            logger.info(
+                f"已清理 {directory} 中 {count} 个旧截图，释放 {reclaimed / 1024 / 1024:.1f} MB"
+            )
+
+
+screenshot_retention = ScreenshotRetention()
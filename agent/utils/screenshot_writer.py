@@ -0,0 +1,112 @@
+"""
+异步截图写入
+该文件的作用为：
+在后台线程池中完成截图的通道转换、编码与保存，动作线程只负责把图像交给写入器。
+待写入数量有上限，超出时按策略阻塞等待或丢弃该帧；AgentServer 关闭前需调用 shutdown 写完剩余截图。
+"""
+
+import os
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.logger import logger
+
+BLOCK = "block"
+DROP = "drop"
+
+# 支持的截图格式及默认压缩等级
+#   png: 压缩等级 0-9（0 最快，Pillow 默认 6）
+#   webp: 无损压缩，method 0-6（0 最快）
+#   npy: 直接保存 BGR 数组，无需通道转换与编码，可用 tools/convert_screenshots.py 离线转为 PNG
+IMAGE_FORMATS = {"png": 6, "webp": 4, "npy": None}
+# 各格式压缩等级的取值范围（含两端）
+COMPRESSION_RANGES = {"png": (0, 9), "webp": (0, 6)}
+
+
+def save_image(screen_array, path: str, fmt: str = "png", compression: int | None = None):
+    """按格式保存 BGR 图像数组（在写入线程中执行）"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    if fmt == "npy":
+        import numpy
+
+        numpy.save(path, screen_array, allow_pickle=False)
+        return
+
+    from PIL import Image
+
+    if len(screen_array.shape) == 3 and screen_array.shape[2] == 3:
+        rgb_array = screen_array[:, :, ::-1]
+    else:
+        rgb_array = screen_array
+
+    if compression is None:
+        compression = IMAGE_FORMATS[fmt]
+    img = Image.fromarray(rgb_array)
+    if fmt == "webp":
+        img.save(path, format="WEBP", lossless=True, method=compression)
+    else:
+        img.save(path, format="PNG", compress_level=compression)
+
+
+class ScreenshotWriter:
+    """
+    有界的后台截图写入器。
+
+    Args:
+        max_workers: 写入线程数
+        max_pending: 最多同时排队/写入的截图数
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 8):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="ScreenshotWriter"
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._closed = False
+        self.dropped = 0
+
+    def submit(self, func, *args, policy: str = BLOCK, **kwargs) -> bool:
+        """
+        提交一个写入任务
+
+        Args:
+            func: 在写入线程中执行的函数
+            policy: 队列已满时的策略，block 阻塞等待，drop 丢弃
+
+        Returns:
+            是否已提交（队列满且策略为 drop 或写入器已关闭时为 False）
+        """
+        if self._closed:
+            logger.warning("截图写入器已关闭，丢弃截图")
+            return False
+
+        if not self._slots.acquire(blocking=policy != DROP):
+            self.dropped += 1
+            logger.warning(f"截图写入队列已满（{self.max_pending}），丢弃截图，累计丢弃 {self.dropped}")
+            return False
+
+        def task():
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                logger.exception("截图写入失败")
+            finally:
+                self._slots.release()
+
+        self._executor.submit(task)
+        return True
+
+    def shutdown(self):
+        """写完剩余截图并关闭线程池"""
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        logger.debug("截图写入器已关闭")
+
+
+screenshot_writer = ScreenshotWriter()
+atexit.register(screenshot_writer.shutdown)
@@ -0,0 +1,322 @@
+"""
+会话录制
+该文件的作用为：
+把整个任务过程中的画面连续写入分块归档文件，供事后回放与性能分析。
+每个分块以关键帧开始，之后的帧保存与上一帧的 XOR 差分（zlib 压缩），
+每帧附带时间戳与节点名；SessionReader 可按时间或节点名查找并解码画面。
+
+目录结构:
+    <save_dir>/<会话开始时间>/
+        index.json          分块列表（时间范围、帧数、出现的节点名）
+        chunk_00000.m2rec   分块文件
+
+分块文件格式:
+    MAGIC | 帧数据... | 索引 JSON | 索引偏移（8 字节小端无符号整数）
+
+配置文件 ./config/session_recorder.json（第一次使用时读取，save_dir 相对于项目根目录）:
+{
+    "enabled": false,
+    "save_dir": "debug/sessions",
+    "chunk_frames": 300,
+    "keyframe_interval": 30,
+    "compress_level": 1,
+    "max_pending": 16
+}
+"""
+
+import os
+import json
+import time
+import zlib
+import queue
+import bisect
+import struct
+import atexit
+import threading
+from datetime import datetime
+
+import numpy
+
+from utils.logger import logger
+from utils.config import LazyInstance, project_path, read_agent_config
+
+MAGIC = b"M2REC\x00\x01\n"
+_FOOTER = struct.Struct("<Q")
+
+
+class _ChunkWriter:
+    """写入单个分块文件（只在录制线程中使用）"""
+
+    def __init__(self, path: str, compress_level: int):
+        self.path = path
+        self.compress_level = compress_level
+        self.frames: list[dict] = []
+        self._file = open(path, "wb")
+        try:
+            self._file.write(MAGIC)
+        except BaseException:
+            self._file.close()
+            raise
+        self._previous: numpy.ndarray | None = None
+
+    def write(self, timestamp: float, node: str, frame: numpy.ndarray, keyframe: bool):
+        if self._previous is None or self._previous.shape != frame.shape:
+            keyframe = True
+        data = frame if keyframe else numpy.bitwise_xor(frame, self._previous)
+        blob = zlib.compress(numpy.ascontiguousarray(data).tobytes(), self.compress_level)
+
+        self.frames.append(
+            {
+                "time": timestamp,
+                "node": node,
+                "key": keyframe,
+                "offset": self._file.tell(),
+                "length": len(blob),
+                "shape": list(frame.shape),
+                "dtype": str(frame.dtype),
+            }
+        )
+        self._file.write(blob)
+        self._previous = frame
+
+    def abort(self):
+        """写入出错时关闭文件，不写索引（该分块不会出现在 index.json 中）"""
+        self._file.close()
+
+    def close(self) -> dict:
+        with self._file:
+            index_offset = self._file.tell()
+            self._file.write(json.dumps({"frames": self.frames}, ensure_ascii=False).encode("utf-8"))
+            self._file.write(_FOOTER.pack(index_offset))
+        return {
+            "file": os.path.basename(self.path),
+            "start": self.frames[0]["time"] if self.frames else None,
+            "end": self.frames[-1]["time"] if self.frames else None,
+            "frames": len(self.frames),
+            "nodes": sorted({frame["node"] for frame in self.frames}),
+        }
+
+
+class SessionRecorder:
+    """
+    连续会话录制器。
+
+    record() 只把帧放入有界队列，压缩与写入在单独的录制线程中按顺序完成；
+    队列已满时丢弃该帧并计数。
+    """
+
+    def __init__(
+        self,
+        save_dir: str = "debug/sessions",
+        chunk_frames: int = 300,
+        keyframe_interval: int = 30,
+        compress_level: int = 1,
+        max_pending: int = 16,
+        enabled: bool = True,
+    ):
+        self.save_dir = save_dir
+        self.chunk_frames = max(1, chunk_frames)
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.compress_level = compress_level
+        self.enabled = enabled
+        self.dropped = 0
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._session_dir: str | None = None
+        self._chunks: list[dict] = []
+
+    def record(self, frame: numpy.ndarray | None, node: str, timestamp: float | None = None):
+        """提交一帧，不阻塞调用方"""
+        if not self.enabled or frame is None or frame.size == 0:
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((timestamp or time.time(), node, frame))
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                logger.warning(f"会话录制队列已满，累计丢弃 {self.dropped} 帧")
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            session_name = datetime.now().strftime("%Y.%m.%d-%H.%M.%S")
+            self._session_dir = os.path.join(self.save_dir, session_name)
+            os.makedirs(self._session_dir, exist_ok=True)
+            self._thread = threading.Thread(
+                target=self._run, name="SessionRecorder", daemon=True
+            )
+            self._thread.start()
+            logger.info(f"会话录制已开始: {self._session_dir}")
+
+    def _run(self):
+        chunk: _ChunkWriter | None = None
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            timestamp, node, frame = item
+            try:
+                if chunk is None:
+                    path = os.path.join(self._session_dir, f"chunk_{len(self._chunks):05d}.m2rec")
+                    chunk = _ChunkWriter(path, self.compress_level)
+                keyframe = len(chunk.frames) % self.keyframe_interval == 0
+                chunk.write(timestamp, node, frame, keyframe)
+                if len(chunk.frames) >= self.chunk_frames:
+                    self._close_chunk(chunk)
+                    chunk = None
+            except Exception:
+                logger.exception("会话录制写入失败")
+                if chunk is not None:
+                    chunk.abort()
+                chunk = None
+        if chunk is not None:
+            self._close_chunk(chunk)
+
+    def _close_chunk(self, chunk: _ChunkWriter):
+        self._chunks.append(chunk.close())
+        index_path = os.path.join(self._session_dir, "index.json")
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"chunks": self._chunks}, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, index_path)
+
+    def close(self):
+        """写完队列中的帧并关闭当前分块"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        logger.info(f"会话录制已结束: {self._session_dir}，丢弃 {self.dropped} 帧")
+
+
+class SessionReader:
+    """
+    读取会话录制目录。
+
+    用法:
+        reader = SessionReader("debug/sessions/2025.01.01-12.00.00")
+        timestamp, node, frame = reader.frame_at(timestamp)
+        for timestamp, frame in reader.frames_of_node("放弃挑战"):
+            ...
+    """
+
+    def __init__(self, session_dir: str):
+        self.session_dir = session_dir
+        with open(os.path.join(session_dir, "index.json"), "r", encoding="utf-8") as f:
+            self.chunks: list[dict] = json.load(f)["chunks"]
+        self._chunk_frames: dict[int, list[dict]] = {}
+
+    def _frames_meta(self, chunk_index: int) -> list[dict]:
+        meta = self._chunk_frames.get(chunk_index)
+        if meta is None:
+            path = os.path.join(self.session_dir, self.chunks[chunk_index]["file"])
+            with open(path, "rb") as f:
+                f.seek(-_FOOTER.size, os.SEEK_END)
+                footer_offset = f.tell()
+                (index_offset,) = _FOOTER.unpack(f.read(_FOOTER.size))
+                f.seek(index_offset)
+                meta = json.loads(f.read(footer_offset - index_offset))["frames"]
+            self._chunk_frames[chunk_index] = meta
+        return meta
+
+    def __len__(self):
+        return sum(chunk["frames"] for chunk in self.chunks)
+
+    def decode(self, chunk_index: int, frame_index: int) -> numpy.ndarray:
+        """解码分块中的一帧（从前一个关键帧开始累积差分）"""
+        meta = self._frames_meta(chunk_index)
+        start = frame_index
+        while not meta[start]["key"]:
+            start -= 1
+
+        path = os.path.join(self.session_dir, self.chunks[chunk_index]["file"])
+        frame = None
+        with open(path, "rb") as f:
+            for item in meta[start : frame_index + 1]:
+                f.seek(item["offset"])
+                data = numpy.frombuffer(
+                    zlib.decompress(f.read(item["length"])), dtype=item["dtype"]
+                ).reshape(item["shape"])
+                frame = data.copy() if item["key"] else numpy.bitwise_xor(frame, data)
+        return frame
+
+    def locate_time(self, timestamp: float) -> tuple[int, int]:
+        """返回不晚于 timestamp 的最后一帧的 (分块序号, 帧序号)"""
+        starts = [chunk["start"] for chunk in self.chunks]
+        chunk_index = max(0, bisect.bisect_right(starts, timestamp) - 1)
+        times = [item["time"] for item in self._frames_meta(chunk_index)]
+        frame_index = max(0, bisect.bisect_right(times, timestamp) - 1)
+        return chunk_index, frame_index
+
+    def frame_at(self, timestamp: float) -> tuple[float, str, numpy.ndarray]:
+        """按时间查找画面，返回 (时间戳, 节点名, 帧)"""
+        chunk_index, frame_index = self.locate_time(timestamp)
+        item = self._frames_meta(chunk_index)[frame_index]
+        return item["time"], item["node"], self.decode(chunk_index, frame_index)
+
+    def locate_node(self, node: str) -> list[tuple[int, int]]:
+        """返回节点名对应的所有 (分块序号, 帧序号)"""
+        result = []
+        for chunk_index, chunk in enumerate(self.chunks):
+            if node not in chunk["nodes"]:
+                continue
+            for frame_index, item in enumerate(self._frames_meta(chunk_index)):
+                if item["node"] == node:
+                    result.append((chunk_index, frame_index))
+        return result
+
+    def frames_of_node(self, node: str):
+        """依次产出节点名对应的 (时间戳, 帧)"""
+        for chunk_index, frame_index in self.locate_node(node):
+            item = self._frames_meta(chunk_index)[frame_index]
+            yield item["time"], self.decode(chunk_index, frame_index)
+
+    def iter_frames(self):
+        """按时间顺序依次产出 (时间戳, 节点名, 帧)"""
+        for chunk_index, chunk in enumerate(self.chunks):
+            frame = None
+            path = os.path.join(self.session_dir, chunk["file"])
+            with open(path, "rb") as f:
+                for item in self._frames_meta(chunk_index):
+                    f.seek(item["offset"])
+                    data = numpy.frombuffer(
+                        zlib.decompress(f.read(item["length"])), dtype=item["dtype"]
+                    ).reshape(item["shape"])
+                    frame = data.copy() if item["key"] else numpy.bitwise_xor(frame, data)
+                    yield item["time"], item["node"], frame
+
+
+def _load_session_recorder() -> SessionRecorder:
+    default_config = {
+        "enabled": False,
+        "save_dir": "debug/sessions",
+        "chunk_frames": 300,
+        "keyframe_interval": 30,
+        "compress_level": 1,
+        "max_pending": 16,
+    }
+    config = read_agent_config("session_recorder", default_config)
+    return SessionRecorder(
+        save_dir=str(project_path(config["save_dir"])),
+        chunk_frames=config["chunk_frames"],
+        keyframe_interval=config["keyframe_interval"],
+        compress_level=config["compress_level"],
+        max_pending=config["max_pending"],
+        enabled=config["enabled"],
+    )
+
+
+def _close_at_exit():
+    if session_recorder.loaded:
+        session_recorder.close()
+
+
+session_recorder = LazyInstance(_load_session_recorder)
+atexit.register(_close_at_exit)
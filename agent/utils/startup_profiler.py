@@ -0,0 +1,183 @@
+"""
+启动阶段耗时分析
+该文件的作用为：
+记录 agent/main.py 启动流程中各阶段的耗时（包括虚拟环境重启前父进程的阶段），
+可选地统计各阶段内新导入模块的耗时，并将结果写入 JSON 文件、在日志中输出摘要。
+"""
+
+import os
+import sys
+import json
+import time
+import builtins
+from pathlib import Path
+from contextlib import contextmanager
+
+from utils.logger import logger
+
+# 虚拟环境重启时，父进程通过该环境变量把已记录的阶段传给子进程
+PARENT_ENV_KEY = "M2GYRO_STARTUP_PROFILE_PARENT"
+
+
+class StartupProfiler:
+    """
+    启动阶段计时器。
+
+    用法:
+        profiler = StartupProfiler(report_path)
+        with profiler.phase("read_interface_version"):
+            ...
+        profiler.write_report()
+
+    注意 agent() 会清理 utils 模块缓存，实例需由 main.py 持有。
+    """
+
+    def __init__(self, report_path: Path, enabled: bool = True, trace_imports=False):
+        self.report_path = Path(report_path)
+        self.enabled = enabled
+        self.trace_imports = trace_imports
+
+        self._started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._phases: list[dict] = []
+        self._open_phases: dict[str, float] = {}
+        self._parent = self._load_parent()
+
+    def configure(
+        self,
+        enabled: bool | None = None,
+        trace_imports: bool | None = None,
+        report_path: Path | None = None,
+    ):
+        """读取配置后调整开关与报告路径"""
+        if enabled is not None:
+            self.enabled = enabled
+        if trace_imports is not None:
+            self.trace_imports = trace_imports
+        if report_path is not None:
+            self.report_path = Path(report_path)
+
+    @contextmanager
+    def phase(self, name: str):
+        """记录一个启动阶段的耗时"""
+        if not self.enabled:
+            yield
+            return
+
+        imports: list[dict] = []
+        original_import = builtins.__import__
+        if self.trace_imports:
+            builtins.__import__ = self._make_traced_import(original_import, imports)
+
+        start = time.perf_counter()
+        self._open_phases[name] = start
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._open_phases.pop(name, None)
+            if self.trace_imports:
+                builtins.__import__ = original_import
+            record = {"name": name, "seconds": round(elapsed, 6)}
+            if self.trace_imports:
+                record["imports"] = sorted(
+                    imports, key=lambda item: item["seconds"], reverse=True
+                )
+            self._phases.append(record)
+
+    def _make_traced_import(self, original_import, imports: list):
+        """包装 __import__，只记录本阶段首次导入的顶层模块（含其子导入的总耗时）"""
+        depth = 0
+
+        def traced_import(name, globals=None, locals=None, fromlist=(), level=0):
+            nonlocal depth
+            if level != 0 or name in sys.modules:
+                return original_import(name, globals, locals, fromlist, level)
+
+            depth += 1
+            start = time.perf_counter()
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                depth -= 1
+                if depth == 0:
+                    imports.append(
+                        {
+                            "module": name,
+                            "seconds": round(time.perf_counter() - start, 6),
+                        }
+                    )
+
+        return traced_import
+
+    def _snapshot(self) -> dict:
+        """当前进程已记录的阶段，未结束的阶段按截至目前的耗时记录"""
+        now = time.perf_counter()
+        phases = list(self._phases)
+        for name, start in self._open_phases.items():
+            phases.append({"name": name, "seconds": round(now - start, 6), "open": True})
+        return {
+            "pid": os.getpid(),
+            "executable": sys.executable,
+            "started_at": self._started_at,
+            "total_seconds": round(now - self._t0, 6),
+            "phases": phases,
+        }
+
+    def relaunch_env(self) -> dict:
+        """虚拟环境重启前调用，返回需要传给子进程的环境变量"""
+        if not self.enabled:
+            return {}
+        snapshot = self._snapshot()
+        snapshot["relaunched_at"] = time.time()
+        return {PARENT_ENV_KEY: json.dumps(snapshot, ensure_ascii=False)}
+
+    def _load_parent(self) -> dict | None:
+        raw = os.environ.pop(PARENT_ENV_KEY, None)
+        if not raw:
+            return None
+        try:
+            parent = json.loads(raw)
+        except Exception:
+            logger.debug("父进程启动耗时数据解析失败")
+            return None
+        # 子进程启动（解释器初始化 + 重新导入）所花的时间
+        parent["relaunch_gap_seconds"] = round(
+            self._started_at - parent.get("relaunched_at", self._started_at), 6
+        )
+        return parent
+
+    def write_report(self) -> None:
+        """写入 JSON 报告并在日志中输出摘要"""
+        if not self.enabled:
+            return
+
+        report = self._snapshot()
+        report["parent"] = self._parent
+
+        try:
+            self.report_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=4, ensure_ascii=False)
+        except Exception:
+            logger.exception(f"写入启动耗时报告失败: {self.report_path}")
+
+        self._log_summary(report)
+
+    def _log_summary(self, report: dict) -> None:
+        parent = report["parent"]
+        total = report["total_seconds"]
+        if parent:
+            total += parent["total_seconds"] + parent["relaunch_gap_seconds"]
+            for item in parent["phases"]:
+                logger.info(f"启动耗时 [父进程] {item['name']}: {item['seconds'] * 1000:.1f} ms")
+            logger.info(f"启动耗时 [重启子进程]: {parent['relaunch_gap_seconds'] * 1000:.1f} ms")
+
+        for item in report["phases"]:
+            logger.info(f"启动耗时 {item['name']}: {item['seconds'] * 1000:.1f} ms")
+            for imported in item.get("imports", [])[:3]:
+                logger.debug(
+                    f"    import {imported['module']}: {imported['seconds'] * 1000:.1f} ms"
+                )
+
+        logger.info(f"启动总耗时 {total * 1000:.1f} ms，报告: {self.report_path}")
@@ -0,0 +1,210 @@
+"""
+模板缓存
+该文件的作用为：
+为自定义识别提供按分辨率归一化的模板集合。
+资源中的模板均按 1280x720 制作。MaaFramework 会把截图缩放到短边 720，
+16:9 画面不需要缩放；其他比例的画面按能放下 1280x720 的统一比例（宽、高比例中较小者）缩放，
+如 4:3 的 960x720 为 0.75，更宽的 1600x720 仍为 1。
+首次在某个比例下使用时，把模板缩放后缓存在内存中并写入磁盘（<cache_dir>/x<比例千分数>/），
+之后同一比例直接读取，识别时只需缩放模板一次，而不必逐帧缩放画面。ROI 按同一比例映射到当前画面。
+
+配置文件 ./config/template_cache.json（第一次使用时读取，cache_dir 相对于项目根目录）:
+{
+    "cache_dir": "cache/templates",
+    "persist": true
+}
+"""
+
+import threading
+from pathlib import Path
+
+import numpy
+
+from utils.logger import logger
+from utils.config import PROJECT_ROOT, LazyInstance, project_path, read_agent_config
+
+# 模板与流水线 ROI 的基准分辨率
+BASE_RESOLUTION = (1280, 720)
+
+# 安装包中资源位于 resource/，开发环境位于 assets/resource/（均相对于项目根目录，与工作目录无关）
+IMAGE_DIRS = (
+    PROJECT_ROOT / "resource" / "base" / "image",
+    PROJECT_ROOT / "assets" / "resource" / "base" / "image",
+)
+
+# BGR -> 灰度的权重（与 OpenCV 一致）
+_GRAY_WEIGHTS = numpy.array([0.114, 0.587, 0.299], dtype=numpy.float32)
+
+
+def to_gray(image: numpy.ndarray) -> numpy.ndarray:
+    """BGR 图像转灰度（uint8）"""
+    if image.ndim == 2:
+        return image
+    return (image[:, :, :3].astype(numpy.float32) @ _GRAY_WEIGHTS).astype(numpy.uint8)
+
+
+def scale_key(resolution: tuple[int, int]) -> int:
+    """当前画面相对基准分辨率的统一缩放比例（千分数，1000 表示不缩放），用作缓存键"""
+    width, height = resolution
+    return round(min(width / BASE_RESOLUTION[0], height / BASE_RESOLUTION[1]) * 1000)
+
+
+def scale_of(resolution: tuple[int, int]) -> float:
+    """当前画面相对基准分辨率的统一缩放比例"""
+    return scale_key(resolution) / 1000
+
+
+def map_roi(roi: list[int], resolution: tuple[int, int]) -> tuple[int, int, int, int]:
+    """
+    把基准分辨率下的 ROI [x, y, w, h] 映射到当前画面。
+
+    位置与大小使用与模板相同的比例，结果裁剪到画面范围内。
+    """
+    scale = scale_of(resolution)
+    x, y, w, h = roi
+    width, height = resolution
+
+    left = max(0, min(width - 1, round(x * scale)))
+    top = max(0, min(height - 1, round(y * scale)))
+    right = max(left + 1, min(width, round((x + w) * scale)))
+    bottom = max(top + 1, min(height, round((y + h) * scale)))
+    return left, top, right - left, bottom - top
+
+
+def _read_png(path: Path, scale: float) -> numpy.ndarray:
+    """读取模板并按比例缩放，返回 BGR 数组"""
+    from PIL import Image
+
+    image = Image.open(path).convert("RGB")
+    if scale != 1:
+        size = (
+            max(1, round(image.width * scale)),
+            max(1, round(image.height * scale)),
+        )
+        image = image.resize(size, Image.Resampling.BILINEAR)
+    return numpy.ascontiguousarray(numpy.asarray(image)[:, :, ::-1])
+
+
+class TemplateCache:
+    """
+    按画面缩放比例缓存缩放后的模板。
+
+    用法:
+        template = template_cache.get("页面/关闭_图标1.png", image.shape[1::-1])
+        gray = template_cache.get("页面/关闭_图标1.png", image.shape[1::-1], gray=True)
+    """
+
+    def __init__(self, cache_dir: str = "cache/templates", persist: bool = True):
+        self.cache_dir = cache_dir
+        self.persist = persist
+        self._templates: dict[tuple[str, int, bool], numpy.ndarray] = {}
+        self._lock = threading.RLock()
+        self._prepared: set[int] = set()
+
+    @staticmethod
+    def image_dir() -> Path | None:
+        for directory in IMAGE_DIRS:
+            if directory.is_dir():
+                return directory
+        return None
+
+    def _source_path(self, name: str) -> Path:
+        image_dir = self.image_dir()
+        if image_dir is None:
+            raise FileNotFoundError(f"找不到模板目录: {[str(directory) for directory in IMAGE_DIRS]}")
+        return image_dir / name
+
+    def _disk_path(self, name: str, key: int) -> Path:
+        return Path(self.cache_dir) / f"x{key:04d}" / f"{name}.npy"
+
+    def _build(self, name: str, key: int) -> numpy.ndarray:
+        source = self._source_path(name)
+        if key == 1000:
+            return _read_png(source, 1)
+
+        cached = self._disk_path(name, key)
+        try:
+            if self.persist and cached.stat().st_mtime >= source.stat().st_mtime:
+                return numpy.load(cached, allow_pickle=False)
+        except (OSError, ValueError):
+            pass
+
+        template = _read_png(source, key / 1000)
+        if self.persist:
+            try:
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                numpy.save(cached, template, allow_pickle=False)
+            except OSError:
+                logger.debug(f"无法写入模板缓存 {cached}")
+        return template
+
+    def get(
+        self, name: str, resolution: tuple[int, int] = BASE_RESOLUTION, gray: bool = False
+    ) -> numpy.ndarray:
+        """
+        获取缩放到当前画面的模板
+
+        Args:
+            name: 相对 image 目录的模板路径，如 "页面/关闭_图标1.png"
+            resolution: 当前画面的 (宽, 高)
+            gray: 是否返回灰度模板
+        """
+        key = (name, scale_key(resolution), gray)
+        template = self._templates.get(key)
+        if template is not None:
+            return template
+
+        with self._lock:
+            template = self._templates.get(key)
+            if template is None:
+                if gray:
+                    template = to_gray(self.get(name, resolution))
+                else:
+                    template = self._build(name, key[1])
+                template.setflags(write=False)
+                self._templates[key] = template
+        return template
+
+    def prepare(self, resolution: tuple[int, int]) -> int:
+        """预先缩放 image 目录下的全部模板，返回模板数量"""
+        image_dir = self.image_dir()
+        if image_dir is None:
+            return 0
+        names = [path.relative_to(image_dir).as_posix() for path in image_dir.rglob("*.png")]
+        for name in names:
+            try:
+                self.get(name, resolution)
+            except Exception:
+                logger.exception(f"缩放模板 {name} 失败")
+        logger.info(f"已为 {resolution[0]}x{resolution[1]} 准备 {len(names)} 个模板")
+        return len(names)
+
+    def prepare_async(self, resolution: tuple[int, int]) -> bool:
+        """
+        在后台线程中准备模板，每个缩放比例只启动一次
+
+        Returns:
+            是否启动了新的准备线程（不需要缩放或已经准备过时为 False）
+        """
+        key = scale_key(resolution)
+        with self._lock:
+            if key == 1000 or key in self._prepared:
+                return False
+            self._prepared.add(key)
+        threading.Thread(
+            target=self.prepare, args=(resolution,), name="TemplateCachePrepare", daemon=True
+        ).start()
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+
+def _load_template_cache() -> TemplateCache:
+    default_config = {"cache_dir": "cache/templates", "persist": True}
+    config = read_agent_config("template_cache", default_config)
+    return TemplateCache(cache_dir=str(project_path(config["cache_dir"])), persist=config["persist"])
+
+
+template_cache = LazyInstance(_load_template_cache)
@@ -0,0 +1,163 @@
+"""
+模板匹配
+该文件的作用为：
+用 NumPy 在灰度图上实现 TM_CCOEFF_NORMED 归一化相关匹配，
+供自定义识别在 Python 端直接比较模板，不必为每个模板单独调用 run_recognition。
+注意：MaaFramework 的 TemplateMatch 在彩色图上计算，同一阈值下两者得分不同，
+仅颜色不同的模板在灰度下可能无法区分，因此不能直接替代原生 TemplateMatch，阈值需单独调整。
+相关运算通过 FFT 完成，窗口内的均值与方差由积分图求得；
+同一区域匹配多个模板时，区域的频谱与积分图只计算一次，各模板的频域运算成批完成。
+"""
+
+import numpy
+
+# 方差低于该值的窗口（纯色区域）得分记为 0
+_EPSILON = 1e-6
+
+
+def _integral(values: numpy.ndarray) -> numpy.ndarray:
+    integral = numpy.zeros((values.shape[0] + 1, values.shape[1] + 1), dtype=numpy.float64)
+    numpy.cumsum(numpy.cumsum(values, axis=0), axis=1, out=integral[1:, 1:])
+    return integral
+
+
+def _window_sums(integral: numpy.ndarray, height: int, width: int) -> numpy.ndarray:
+    """由积分图求每个 height x width 窗口内元素之和（仅完整窗口）"""
+    return (
+        integral[height:, width:]
+        - integral[:-height, width:]
+        - integral[height:, :-width]
+        + integral[:-height, :-width]
+    )
+
+
+class MatchRegion:
+    """
+    待匹配的灰度区域。
+
+    用法:
+        region = MatchRegion(gray[y : y + h, x : x + w])
+        score, dx, dy = region.best(template_a)
+        (score_b, bx, by), (score_c, cx, cy) = region.best_many([template_b, template_c])
+    """
+
+    def __init__(self, image: numpy.ndarray):
+        self.image = image.astype(numpy.float64)
+        self.shape = self.image.shape[:2]
+        self._spectrum: numpy.ndarray | None = None
+        self._sums: numpy.ndarray | None = None
+        self._squares: numpy.ndarray | None = None
+
+    def _prepare(self):
+        if self._spectrum is None:
+            self._spectrum = numpy.fft.rfft2(self.image)
+            self._sums = _integral(self.image)
+            self._squares = _integral(self.image * self.image)
+
+    def _normalize(
+        self, correlation: numpy.ndarray, height: int, width: int, template_norm: float
+    ) -> numpy.ndarray:
+        """相关值除以窗口与模板的标准差之积"""
+        count = height * width
+        sums = _window_sums(self._sums, height, width)
+        squares = _window_sums(self._squares, height, width)
+        variance = numpy.maximum(squares - sums * sums / count, 0)
+        denominator = numpy.sqrt(variance) * template_norm
+
+        scores = numpy.zeros_like(correlation)
+        valid = denominator > _EPSILON
+        scores[valid] = correlation[valid] / denominator[valid]
+        return numpy.clip(scores, -1, 1)
+
+    def scores(self, template: numpy.ndarray) -> numpy.ndarray:
+        """
+        计算归一化相关系数得分图
+
+        Returns:
+            形状为 (H - h + 1, W - w + 1) 的得分图，取值 -1 ~ 1；模板比区域大时返回空数组
+        """
+        return self.scores_many([template])[0]
+
+    def scores_many(self, templates: list[numpy.ndarray]) -> list[numpy.ndarray]:
+        """
+        一次计算多个模板的得分图
+
+        各模板补零到区域尺寸后叠成一批，频域乘积与逆变换对整批一次完成。
+        """
+        results: list[numpy.ndarray] = [numpy.empty((0, 0), dtype=numpy.float64)] * len(
+            templates
+        )
+        fits = [
+            index
+            for index, template in enumerate(templates)
+            if template.shape[0] <= self.shape[0] and template.shape[1] <= self.shape[1]
+        ]
+        if not fits:
+            return results
+        self._prepare()
+
+        batch = numpy.zeros((len(fits), *self.shape), dtype=numpy.float64)
+        norms = []
+        for slot, index in enumerate(fits):
+            template = templates[index].astype(numpy.float64)
+            template = template - template.mean()
+            norms.append(numpy.sqrt((template * template).sum()))
+            batch[slot, : template.shape[0], : template.shape[1]] = template[::-1, ::-1]
+
+        # 循环卷积中下标 >= 模板尺寸 - 1 的部分不受回绕影响，恰好是完整窗口
+        spectrum = self._spectrum * numpy.fft.rfft2(batch)
+        correlations = numpy.fft.irfft2(spectrum, s=self.shape)
+
+        for slot, index in enumerate(fits):
+            height, width = templates[index].shape[:2]
+            correlation = correlations[slot, height - 1 :, width - 1 :]
+            results[index] = self._normalize(correlation, height, width, norms[slot])
+        return results
+
+    def best(self, template: numpy.ndarray) -> tuple[float, int, int]:
+        """返回 (最高得分, x, y)，坐标相对区域左上角；无法匹配时得分为 -1"""
+        return _peak(self.scores(template))
+
+    def best_many(
+        self,
+        templates: list[numpy.ndarray],
+        windows: list[tuple[int, int, int, int] | None] | None = None,
+    ) -> list[tuple[float, int, int]]:
+        """
+        一次匹配多个模板，返回每个模板的 (最高得分, x, y)
+
+        Args:
+            windows: 每个模板允许出现的范围 [x, y, w, h]（相对区域左上角），
+                     模板必须完整落在范围内；为 None 表示整个区域
+        """
+        windows = windows or [None] * len(templates)
+        results = []
+        for template, scores, window in zip(templates, self.scores_many(templates), windows):
+            left = top = 0
+            if window is not None and scores.size:
+                x, y, w, h = window
+                height, width = template.shape[:2]
+                left, top = max(0, x), max(0, y)
+                bottom = max(top, y + h - height + 1)
+                right = max(left, x + w - width + 1)
+                scores = scores[top:bottom, left:right]
+            score, dx, dy = _peak(scores)
+            results.append((score, left + dx, top + dy))
+        return results
+
+
+def _peak(scores: numpy.ndarray) -> tuple[float, int, int]:
+    if scores.size == 0:
+        return -1.0, 0, 0
+    y, x = numpy.unravel_index(int(numpy.argmax(scores)), scores.shape)
+    return float(scores[y, x]), int(x), int(y)
+
+
+def match_template(image: numpy.ndarray, template: numpy.ndarray) -> numpy.ndarray:
+    """单个模板的得分图"""
+    return MatchRegion(image).scores(template)
+
+
+def best_match(image: numpy.ndarray, template: numpy.ndarray) -> tuple[float, int, int]:
+    """单个模板的 (最高得分, x, y)"""
+    return MatchRegion(image).best(template)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+截图格式转换脚本 - 将 ScreenShot 以 "format": "npy" 保存的原始 BGR 数组转换为 PNG
+
+使用方法:
+    python convert_screenshots.py <目录或文件> [--compression N] [--delete] [--recursive]
+
+参数:
+    目录或文件: .npy 截图文件，或包含 .npy 截图的目录
+    --compression: PNG 压缩等级 0-9，默认 6
+    --delete: 转换成功后删除原 .npy 文件
+    --recursive: 递归处理子目录
+
+示例:
+    # 转换 debug 目录下的所有原始截图
+    python convert_screenshots.py ./debug/screenshot
+
+    # 转换后删除原文件
+    python convert_screenshots.py ./debug/screenshot --delete
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+import numpy
+from PIL import Image
+
+
+def convert_file(npy_path: Path, compression: int = 6) -> Path:
+    """把一个 .npy（BGR）截图转换为同名 .png，返回 PNG 路径"""
+    screen_array = numpy.load(npy_path, allow_pickle=False)
+    if screen_array.ndim == 3 and screen_array.shape[2] == 3:
+        screen_array = screen_array[:, :, ::-1]
+
+    png_path = npy_path.with_suffix(".png")
+    Image.fromarray(screen_array).save(png_path, format="PNG", compress_level=compression)
+    return png_path
+
+
+def find_npy_files(path: Path, recursive: bool) -> list[Path]:
+    if path.is_file():
+        return [path] if path.suffix == ".npy" else []
+    pattern = "**/*.npy" if recursive else "*.npy"
+    return sorted(path.glob(pattern))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="将 ScreenShot 保存的 .npy 原始截图转换为 PNG"
+    )
+    parser.add_argument("path", help=".npy 文件或包含 .npy 文件的目录")
+    parser.add_argument(
+        "--compression", type=int, default=6, help="PNG 压缩等级 0-9，默认 6"
+    )
+    parser.add_argument("--delete", action="store_true", help="转换成功后删除原文件")
+    parser.add_argument("--recursive", action="store_true", help="递归处理子目录")
+
+    args = parser.parse_args()
+
+    path = Path(args.path)
+    if not path.exists():
+        print(f"错误: 路径不存在: {path}")
+        sys.exit(1)
+
+    npy_files = find_npy_files(path, args.recursive)
+    if not npy_files:
+        print(f"在 {path} 中未找到 .npy 文件")
+        sys.exit(0)
+
+    print(f"找到 {len(npy_files)} 个 .npy 文件")
+
+    failed = 0
+    for npy_path in npy_files:
+        try:
+            png_path = convert_file(npy_path, args.compression)
+        except Exception as e:
+            failed += 1
+            print(f"转换失败: {npy_path}: {e}")
+            continue
+        if args.delete:
+            npy_path.unlink()
+        print(f"{npy_path} -> {png_path}")
+
+    print(f"完成: 成功 {len(npy_files) - failed} 个，失败 {failed} 个")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
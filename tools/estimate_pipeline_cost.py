@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+识别开销估算脚本 - 静态分析 pipeline，估算每个节点的识别开销并给出更廉价的识别方式建议
+
+使用方法:
+    python estimate_pipeline_cost.py [--resource 资源目录...] [--top 30] [--output cost.json]
+                                     [--compare 上次的cost.json]
+
+参数:
+    --resource: 资源目录，可多个，后面的目录覆盖前面的同名节点，默认 assets/resource/base
+    --top: 输出开销最高的前 N 个节点，默认 30
+    --output: 将全部节点的估算结果写入 JSON，便于提交到仓库或在 CI 中跟踪
+    --compare: 与之前 --output 生成的文件比较，列出开销变化的节点
+
+估算方法:
+    开销以 1280x720 画面上的相对毫秒数表示，只用于互相比较，不代表实际耗时：
+    - TemplateMatch: 每个模板 × ROI 面积
+    - OCR: 固定的检测/识别开销 + ROI 面积
+    - ColorMatch / FeatureMatch / NeuralNetwork*: 按各自系数 × ROI 面积
+    - And / Or: 子识别开销之和（Or 按全部未命中的最坏情况），并记录嵌套深度
+    - 引用其他节点的子识别按被引用节点计算
+    - 已知的自定义识别按参数展开：WhereAmI 按页面树"页面识别"（expected 限定的分支），
+      ParallelAny 按 any_of 视为 Or，CachedRecognition 按 node（缓存未命中的情况），
+      MultiTemplate 按模板数 × ROI 面积；其余自定义识别按固定开销计
+    热度为该节点被多少个 next 列表引用（每个引用它的节点轮询时都会识别它一次），
+    排序依据为 (开销 × (1 + 0.1 × 嵌套深度) + 0.05 × 延迟) × (1 + 热度)：
+    每层嵌套多一次子结果的汇总，延迟只在节点命中后发生，按约 20 次轮询命中一次计入。
+
+建议:
+    expected 为固定文字（不含正则元字符）的 OCR 节点会被标记，这类界面文字通常可以改用
+    TemplateMatch 或 ColorMatch，开销低一个数量级。
+
+示例:
+    python estimate_pipeline_cost.py
+    python estimate_pipeline_cost.py --resource ../assets/resource/base ../assets/resource/yun --top 50
+    python estimate_pipeline_cost.py --output cost.json --compare cost_old.json
+"""
+
+import re
+import json
+import argparse
+from pathlib import Path
+
+from migrate_pipeline_v5 import parse_jsonc
+from pipeline_utils import load_pipeline, strip_prefix
+
+working_dir = Path(__file__).parent.parent
+
+SCREEN_WIDTH, SCREEN_HEIGHT = 1280, 720
+SCREEN_AREA = SCREEN_WIDTH * SCREEN_HEIGHT
+
+# 整个 1280x720 画面上的相对开销（毫秒）
+TEMPLATE_FULL_SCREEN = 10.0
+OCR_BASE = 15.0
+OCR_FULL_SCREEN = 60.0
+COLOR_FULL_SCREEN = 2.0
+FEATURE_FULL_SCREEN = 40.0
+NEURAL_NETWORK_BASE = 30.0
+# 未知的自定义识别无法静态估算，按一次中等规模的模板匹配计
+CUSTOM_COST = 5.0
+# WhereAmI 执行的页面树节点（pipeline/UI/page.json）
+PAGE_TREE = "页面识别"
+
+# 排序权重：每层 Or/And 嵌套的额外开销比例，延迟（毫秒）计入的比例
+DEPTH_WEIGHT = 0.1
+DELAY_WEIGHT = 0.05
+
+# 出现这些字符的 expected 视为正则
+REGEX_CHARS = re.compile(r"[\\^$.*+?()\[\]{}|]")
+
+
+def recognition_of(node: dict) -> tuple[str, dict]:
+    """返回 (识别类型, 识别参数)，兼容 {"type", "param"} 与平铺两种写法"""
+    recognition = node.get("recognition", "DirectHit")
+    if isinstance(recognition, dict):
+        return recognition.get("type", "DirectHit"), recognition.get("param", {}) or {}
+    return recognition, node
+
+
+def custom_of(param: dict) -> tuple[str, dict]:
+    """Custom 识别的 (识别名, 识别参数)，识别参数可以是对象或 JSON 字符串"""
+    custom_param = param.get("custom_recognition_param", {})
+    if isinstance(custom_param, str):
+        try:
+            custom_param = json.loads(custom_param) if custom_param else {}
+        except json.JSONDecodeError:
+            custom_param = {}
+    if not isinstance(custom_param, dict):
+        custom_param = {}
+    return param.get("custom_recognition", ""), custom_param
+
+
+def as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def roi_area(param: dict) -> int:
+    """ROI 面积；未设置、引用其他节点或宽高为 0 时按整个画面计算"""
+    roi = param.get("roi")
+    offset = param.get("roi_offset", [0, 0, 0, 0])
+    if isinstance(roi, list) and len(roi) == 4:
+        width, height = roi[2] + offset[2], roi[3] + offset[3]
+        if width > 0 and height > 0:
+            return min(width, SCREEN_WIDTH) * min(height, SCREEN_HEIGHT)
+    elif isinstance(roi, str) and offset[2] > 0 and offset[3] > 0:
+        # 以其他节点的识别结果为 ROI，只能用偏移量估计大小
+        return offset[2] * offset[3]
+    return SCREEN_AREA
+
+
+class CostEstimator:
+    def __init__(self, nodes: dict[str, dict]):
+        self.nodes = nodes
+        self._cache: dict[str, tuple[float, int]] = {}
+
+    def node_cost(self, name: str, visiting: frozenset = frozenset()) -> tuple[float, int]:
+        """节点的 (识别开销, Or/And 嵌套深度)"""
+        if name in self._cache:
+            return self._cache[name]
+        if name in visiting or name not in self.nodes:
+            return 0.0, 0
+        result = self.recognition_cost(self.nodes[name], visiting | {name})
+        self._cache[name] = result
+        return result
+
+    def branches(self, reco_type: str, param: dict) -> list | None:
+        """组合识别的子识别（节点名或识别对象），不是组合识别时返回 None"""
+        if reco_type in ("And", "Or"):
+            return as_list(param.get("any_of" if reco_type == "Or" else "all_of"))
+        if reco_type != "Custom":
+            return None
+
+        name, custom_param = custom_of(param)
+        if name == "WhereAmI" and PAGE_TREE in self.nodes:
+            _, tree_param = recognition_of(self.nodes[PAGE_TREE])
+            pages = as_list(custom_param.get("expected"))
+            return [
+                branch
+                for branch in as_list(tree_param.get("any_of"))
+                if not pages
+                or (isinstance(branch, str) and branch.removeprefix(f"{PAGE_TREE}-") in pages)
+            ]
+        if name == "ParallelAny":
+            return as_list(custom_param.get("any_of"))
+        if name == "CachedRecognition" and isinstance(custom_param.get("node"), str):
+            return [custom_param["node"]]
+        return None
+
+    def recognition_cost(self, node: dict, visiting: frozenset) -> tuple[float, int]:
+        reco_type, param = recognition_of(node)
+        area_ratio = roi_area(param) / SCREEN_AREA
+
+        branches = self.branches(reco_type, param)
+        if branches is not None:
+            total = 0.0
+            depth = 0
+            for branch in branches:
+                if isinstance(branch, str):
+                    cost, branch_depth = self.node_cost(branch, visiting)
+                else:
+                    cost, branch_depth = self.recognition_cost(branch, visiting)
+                total += cost
+                depth = max(depth, branch_depth)
+            return total, depth + 1
+
+        if reco_type == "DirectHit":
+            return 0.0, 0
+        if reco_type == "TemplateMatch":
+            templates = max(1, len(as_list(param.get("template"))))
+            return templates * TEMPLATE_FULL_SCREEN * area_ratio, 0
+        if reco_type == "OCR":
+            return OCR_BASE + OCR_FULL_SCREEN * area_ratio, 0
+        if reco_type == "ColorMatch":
+            return COLOR_FULL_SCREEN * area_ratio, 0
+        if reco_type == "FeatureMatch":
+            templates = max(1, len(as_list(param.get("template"))))
+            return templates * FEATURE_FULL_SCREEN * area_ratio, 0
+        if reco_type.startswith("NeuralNetwork"):
+            return NEURAL_NETWORK_BASE * max(area_ratio, 0.25), 0
+        if reco_type == "Custom":
+            name, custom_param = custom_of(param)
+            if name == "MultiTemplate":
+                templates = max(1, len(as_list(custom_param.get("template"))))
+                custom_ratio = roi_area(custom_param) / SCREEN_AREA
+                return templates * TEMPLATE_FULL_SCREEN * custom_ratio, 0
+        return CUSTOM_COST, 0
+
+    def ocr_advice(self, node: dict, visiting: frozenset = frozenset()) -> list[str]:
+        """expected 全部为固定文字的 OCR（含子识别）返回这些文字，否则返回空列表"""
+        reco_type, param = recognition_of(node)
+        branches = self.branches(reco_type, param)
+        if branches is not None:
+            texts = []
+            for branch in branches:
+                if isinstance(branch, dict):
+                    texts.extend(self.ocr_advice(branch, visiting))
+                elif branch in self.nodes and branch not in visiting:
+                    texts.extend(self.ocr_advice(self.nodes[branch], visiting | {branch}))
+            return texts
+
+        texts = []
+        if reco_type == "OCR":
+            texts = [text for text in as_list(param.get("expected")) if isinstance(text, str)]
+        if not texts or any(REGEX_CHARS.search(text) for text in texts):
+            return []
+        return texts
+
+
+def reference_counts(nodes: dict[str, dict]) -> dict[str, int]:
+    """每个节点被多少个 next / on_error 列表引用"""
+    counts: dict[str, int] = {}
+    for node in nodes.values():
+        for field in ("next", "on_error"):
+            for candidate in as_list(node.get(field)):
+                if isinstance(candidate, str):
+                    name = strip_prefix(candidate)
+                    counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def estimate(nodes: dict[str, dict], files: dict[str, str], defaults: dict) -> list[dict]:
+    estimator = CostEstimator(nodes)
+    references = reference_counts(nodes)
+    results = []
+    for name, node in nodes.items():
+        cost, depth = estimator.node_cost(name)
+        reco_type, _ = recognition_of(node)
+        delay = sum(
+            node.get(field, defaults.get(field, 0))
+            for field in ("pre_delay", "post_delay", "pre_wait_freezes", "post_wait_freezes")
+            if isinstance(node.get(field, defaults.get(field, 0)), int)
+        )
+        heat = references.get(name, 0)
+        results.append(
+            {
+                "node": name,
+                "file": files[name],
+                "type": reco_type,
+                "cost": round(cost, 2),
+                "depth": depth,
+                "heat": heat,
+                "score": round(
+                    (cost * (1 + DEPTH_WEIGHT * depth) + DELAY_WEIGHT * delay) * (1 + heat), 2
+                ),
+                "delay_ms": delay,
+                "rate_limit_ms": node.get("rate_limit", defaults.get("rate_limit", 0)),
+                "static_ocr": list(dict.fromkeys(estimator.ocr_advice(node))),
+            }
+        )
+    results.sort(key=lambda item: -item["score"])
+    return results
+
+
+def load_defaults(resource_dirs: list[str]) -> dict:
+    defaults = {}
+    for resource_dir in resource_dirs:
+        path = Path(resource_dir, "default_pipeline.json")
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                defaults.update(parse_jsonc(f.read()).get("Default", {}))
+    return defaults
+
+
+def compare(results: list[dict], baseline_path: str):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {item["node"]: item for item in json.load(f)["nodes"]}
+    current = {item["node"]: item for item in results}
+
+    print(f"\n与 {baseline_path} 比较:")
+    changed = 0
+    for name in sorted(set(baseline) | set(current)):
+        before = baseline.get(name, {}).get("cost", 0.0)
+        after = current.get(name, {}).get("cost", 0.0)
+        if abs(after - before) >= 0.01:
+            changed += 1
+            print(f"  {name}: {before} -> {after} ({after - before:+.2f})")
+    total_before = sum(item.get("cost", 0.0) for item in baseline.values())
+    total_after = sum(item["cost"] for item in results)
+    print(f"  {changed} 个节点变化，总开销 {total_before:.1f} -> {total_after:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="估算 pipeline 各节点的识别开销")
+    parser.add_argument(
+        "--resource",
+        nargs="+",
+        default=[str(working_dir / "assets" / "resource" / "base")],
+        help="资源目录，可多个",
+    )
+    parser.add_argument("--top", type=int, default=30, help="输出开销最高的前 N 个节点")
+    parser.add_argument("--output", help="估算结果输出路径")
+    parser.add_argument("--compare", help="与之前的估算结果比较")
+
+    args = parser.parse_args()
+
+    nodes, files = load_pipeline(args.resource)
+    results = estimate(nodes, files, load_defaults(args.resource))
+
+    type_counts: dict[str, int] = {}
+    for item in results:
+        type_counts[item["type"]] = type_counts.get(item["type"], 0) + 1
+    print(f"节点 {len(results)} 个，识别类型: {type_counts}")
+    print(f"总识别开销 {sum(item['cost'] for item in results):.1f}\n")
+
+    print(f"开销最高的 {args.top} 个节点（(开销 × 嵌套系数 + 延迟系数) × (1 + 热度)）:")
+    for item in results[: args.top]:
+        depth_text = f"，嵌套 {item['depth']} 层" if item["depth"] else ""
+        print(
+            f"  {item['score']:>8.1f}  {item['node']} [{item['type']}] 开销 {item['cost']}"
+            f"，被引用 {item['heat']} 次{depth_text}，延迟 {item['delay_ms']} ms  ({item['file']})"
+        )
+
+    advice = [item for item in results if item["static_ocr"]]
+    print(f"\n可改用模板/颜色匹配的固定文字 OCR 节点 {len(advice)} 个:")
+    for item in advice:
+        print(f"  {item['node']}: {item['static_ocr']} 开销 {item['cost']}  ({item['file']})")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"nodes": results}, f, indent=4, ensure_ascii=False)
+        print(f"\n估算结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
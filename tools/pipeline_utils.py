@@ -0,0 +1,40 @@
+"""
+Pipeline 读取工具 - 供 reorder_pipeline.py 与 estimate_pipeline_cost.py 共用
+
+提供:
+    PREFIX_PATTERN: next 候选的前缀，如 [JumpBack]、[Anchor]
+    strip_prefix: 去掉 next 候选的前缀
+    load_pipeline: 读取资源目录下的全部节点（支持 JSONC）
+"""
+
+import re
+from pathlib import Path
+
+from migrate_pipeline_v5 import parse_jsonc
+
+# next 候选的前缀，如 [JumpBack]、[Anchor]
+PREFIX_PATTERN = re.compile(r"^(\[[^\]]+\])+")
+
+
+def strip_prefix(candidate: str) -> str:
+    return PREFIX_PATTERN.sub("", candidate)
+
+
+def load_pipeline(resource_dirs: list[str]) -> tuple[dict[str, dict], dict[str, str]]:
+    """
+    读取资源目录下的全部节点，后面的目录按字段覆盖前面的同名节点
+
+    Returns:
+        (节点, 节点最后所在的文件（相对资源目录的上一级）)
+    """
+    nodes: dict[str, dict] = {}
+    files: dict[str, str] = {}
+    for resource_dir in resource_dirs:
+        for path in sorted(Path(resource_dir, "pipeline").rglob("*.json")):
+            with open(path, "r", encoding="utf-8") as f:
+                data = parse_jsonc(f.read())
+            for name, node in data.items():
+                if isinstance(node, dict):
+                    nodes[name] = {**nodes.get(name, {}), **node}
+                    files[name] = path.relative_to(Path(resource_dir).parent).as_posix()
+    return nodes, files
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+识别顺序优化脚本 - 按实际命中率重排 next 列表与 Or 分支
+
+使用方法:
+    python reorder_pipeline.py <统计文件...> [--resource 资源目录...] [--output override.json]
+                               [--min-samples 20] [--min-gain 0.05] [--reorder-jumpback]
+
+参数:
+    统计文件: 识别统计 JSON，可以是 agent 开启 recognition_trace 后生成的
+              debug/recognition_stats.json，也可以是 replay_task.py --output 生成的回放报告；
+              多个文件的次数会累加
+    --resource: 资源目录，可多个，后面的目录覆盖前面的同名节点，默认 assets/resource/base
+    --output: 写出 pipeline_override 文件；不指定时只输出报告（dry-run）
+    --min-samples: 候选节点至少被识别多少次才参与排序，默认 20
+    --min-gain: 每轮预计减少的识别次数低于该值时不调整，默认 0.05
+    --reorder-jumpback: 同时调整 [JumpBack] 候选的位置（默认保持原位，避免改变打断处理的优先级）
+
+原理:
+    next 与 Or 都按顺序识别，第一个命中即停止。候选 i 被识别的概率为前面候选都未命中的概率，
+    每轮预计识别次数 = Σ Π(1 - p_j)，p 为统计得到的命中率。按命中率从高到低排列可使该值最小。
+    样本不足的候选保持原位，只在有统计数据的候选之间交换位置。
+
+注意:
+    多个候选可能同时命中时，顺序决定选中哪一个，请检查报告后再使用生成的 override。
+
+示例:
+    python reorder_pipeline.py ../debug/recognition_stats.json
+    python reorder_pipeline.py report1.json report2.json --output reorder_override.json
+"""
+
+import json
+import argparse
+from pathlib import Path
+
+from pipeline_utils import load_pipeline, strip_prefix
+
+working_dir = Path(__file__).parent.parent
+
+
+def load_stats(paths: list[str]) -> dict[str, dict]:
+    """读取并累加识别统计"""
+    merged: dict[str, dict] = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            recognitions = json.load(f).get("recognitions", {})
+        for node, stats in recognitions.items():
+            total = merged.setdefault(node, {"calls": 0, "hits": 0, "total_ms": 0.0})
+            calls = stats.get("calls", 0)
+            total["calls"] += calls
+            total["hits"] += stats.get("hits", 0)
+            total["total_ms"] += stats.get("total_ms", stats.get("mean_ms", 0.0) * calls)
+    return merged
+
+
+def any_of_names(node: dict) -> list[str] | None:
+    """Or 节点中以节点名给出的分支；含内联分支时返回 None"""
+    recognition = node.get("recognition")
+    if isinstance(recognition, dict):
+        if recognition.get("type") != "Or":
+            return None
+        any_of = recognition.get("param", {}).get("any_of")
+    elif recognition == "Or":
+        any_of = node.get("any_of")
+    else:
+        return None
+    if not isinstance(any_of, list) or not all(isinstance(item, str) for item in any_of):
+        return None
+    return any_of
+
+
+def expected_cost(order: list[str], rates: dict[str, float], costs: dict[str, float]):
+    """按顺序识别时每轮的预计 (识别次数, 耗时 ms)"""
+    reach = 1.0
+    calls = 0.0
+    milliseconds = 0.0
+    for candidate in order:
+        calls += reach
+        milliseconds += reach * costs.get(candidate, 0.0)
+        reach *= 1 - rates.get(candidate, 0.0)
+    return calls, milliseconds
+
+
+def propose_order(
+    candidates: list[str], stats: dict[str, dict], min_samples: int, reorder_jumpback: bool
+) -> list[str]:
+    """样本充足的候选按命中率降序填回它们原来占据的位置，其余候选保持原位"""
+
+    def movable(candidate: str) -> bool:
+        if not reorder_jumpback and candidate.startswith("[JumpBack]"):
+            return False
+        return stats.get(strip_prefix(candidate), {}).get("calls", 0) >= min_samples
+
+    def rate(candidate: str) -> float:
+        node_stats = stats[strip_prefix(candidate)]
+        return node_stats["hits"] / node_stats["calls"]
+
+    slots = [index for index, candidate in enumerate(candidates) if movable(candidate)]
+    ranked = sorted((candidates[index] for index in slots), key=rate, reverse=True)
+    order = list(candidates)
+    for index, candidate in zip(slots, ranked):
+        order[index] = candidate
+    return order
+
+
+def analyze(
+    nodes: dict[str, dict],
+    stats: dict[str, dict],
+    min_samples: int,
+    min_gain: float,
+    reorder_jumpback: bool,
+) -> list[dict]:
+    rates = {
+        name: node_stats["hits"] / node_stats["calls"]
+        for name, node_stats in stats.items()
+        if node_stats["calls"]
+    }
+    costs = {
+        name: node_stats["total_ms"] / node_stats["calls"]
+        for name, node_stats in stats.items()
+        if node_stats["calls"]
+    }
+
+    changes = []
+    for name, node in nodes.items():
+        lists = []
+        next_list = node.get("next")
+        if isinstance(next_list, str):
+            next_list = [next_list]
+        if isinstance(next_list, list) and all(isinstance(item, str) for item in next_list):
+            lists.append(("next", next_list))
+        any_of = any_of_names(node)
+        if any_of:
+            lists.append(("any_of", any_of))
+
+        for field, candidates in lists:
+            if len(candidates) < 2:
+                continue
+            proposed = propose_order(candidates, stats, min_samples, reorder_jumpback)
+            if proposed == candidates:
+                continue
+
+            plain = [strip_prefix(candidate) for candidate in candidates]
+            plain_proposed = [strip_prefix(candidate) for candidate in proposed]
+            current_calls, current_ms = expected_cost(plain, rates, costs)
+            proposed_calls, proposed_ms = expected_cost(plain_proposed, rates, costs)
+            gain = current_calls - proposed_calls
+            if gain < min_gain:
+                continue
+
+            # 每一轮都会识别第一个候选，用其识别次数估计轮数
+            rounds = stats.get(plain[0], {}).get("calls") or max(
+                stats.get(candidate, {}).get("calls", 0) for candidate in plain
+            )
+            changes.append(
+                {
+                    "node": name,
+                    "field": field,
+                    "current": candidates,
+                    "proposed": proposed,
+                    "rates": {
+                        candidate: round(rates[candidate], 3)
+                        for candidate in plain
+                        if candidate in rates
+                    },
+                    "calls_per_round": (round(current_calls, 3), round(proposed_calls, 3)),
+                    "ms_per_round": (round(current_ms, 2), round(proposed_ms, 2)),
+                    "rounds": rounds,
+                    "saved_calls": round(gain * rounds),
+                    "saved_ms": round((current_ms - proposed_ms) * rounds),
+                }
+            )
+
+    changes.sort(key=lambda change: -change["saved_calls"])
+    return changes
+
+
+def build_override(changes: list[dict]) -> dict:
+    override: dict[str, dict] = {}
+    for change in changes:
+        node_override = override.setdefault(change["node"], {})
+        if change["field"] == "next":
+            node_override["next"] = change["proposed"]
+        else:
+            node_override["recognition"] = {
+                "type": "Or",
+                "param": {"any_of": change["proposed"]},
+            }
+    return override
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按实际命中率重排 next 列表与 Or 分支")
+    parser.add_argument("stats", nargs="+", help="识别统计文件")
+    parser.add_argument(
+        "--resource",
+        nargs="+",
+        default=[str(working_dir / "assets" / "resource" / "base")],
+        help="资源目录，可多个",
+    )
+    parser.add_argument("--output", help="pipeline_override 输出路径")
+    parser.add_argument("--min-samples", type=int, default=20, help="参与排序的最少识别次数")
+    parser.add_argument("--min-gain", type=float, default=0.05, help="每轮最少减少的识别次数")
+    parser.add_argument(
+        "--reorder-jumpback", action="store_true", help="同时调整 [JumpBack] 候选的位置"
+    )
+
+    args = parser.parse_args()
+
+    stats = load_stats(args.stats)
+    nodes, _ = load_pipeline(args.resource)
+    changes = analyze(nodes, stats, args.min_samples, args.min_gain, args.reorder_jumpback)
+
+    print(f"统计节点 {len(stats)} 个，流水线节点 {len(nodes)} 个，建议调整 {len(changes)} 处")
+    total_calls = 0
+    total_ms = 0
+    for change in changes:
+        total_calls += change["saved_calls"]
+        total_ms += change["saved_ms"]
+        current_calls, proposed_calls = change["calls_per_round"]
+        print(f"\n{change['node']} ({change['field']})，{change['rounds']} 轮")
+        print(f"  当前: {change['current']}")
+        print(f"  建议: {change['proposed']}")
+        print(f"  命中率: {change['rates']}")
+        print(
+            f"  每轮识别 {current_calls} -> {proposed_calls} 次，"
+            f"预计减少 {change['saved_calls']} 次识别 / {change['saved_ms']} ms"
+        )
+    print(f"\n合计预计减少 {total_calls} 次识别，约 {total_ms / 1000:.1f} s")
+
+    if not args.output:
+        print("未指定 --output，仅输出报告")
+        return
+    if not changes:
+        print("没有需要调整的节点，不写出文件")
+        return
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(build_override(changes), f, indent=4, ensure_ascii=False)
+    print(f"pipeline_override 已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+离线回放脚本 - 使用录制的画面运行流水线任务，无需模拟器
+
+使用方法:
+    python replay_task.py <画面目录> <任务入口> [--script 脚本.json] [--resource 资源目录...]
+                          [--override override.json] [--output report.json]
+
+参数:
+    画面目录: 截图目录（.png/.webp/.jpg/.npy）或 session_recorder 录制的会话目录
+    任务入口: 要运行的任务节点，如 启动游戏、空任务层
+    --script: 回放脚本，定义点击/滑动后切换到哪一帧（格式见 agent/utils/replay_controller.py）
+    --resource: 资源目录，可多个，默认 assets/resource/base
+    --override: pipeline_override JSON 文件
+    --output: 将回放报告写入 JSON 文件
+
+输出:
+    任务结果、节点跳转顺序、各识别节点的调用次数与耗时（平均 / p95 / 最大）
+
+示例:
+    python replay_task.py ./debug/sessions/2025.01.01-12.00.00 启动游戏
+    python replay_task.py ./debug/screenshot 空任务层 --script replay.json --output report.json
+"""
+
+import sys
+import json
+import time
+import argparse
+import importlib
+from pathlib import Path
+
+working_dir = Path(__file__).parent.parent
+agent_dir = working_dir / "agent"
+sys.path.insert(0, str(agent_dir))
+
+from maa.resource import Resource
+from maa.tasker import Tasker
+from maa.context import Context, ContextEventSink
+from maa.event_sink import NotificationType
+
+from utils.replay_controller import ReplayController
+
+
+class ReplayTimingSink(ContextEventSink):
+    """记录识别耗时与节点跳转"""
+
+    def __init__(self):
+        super().__init__()
+        self.transitions: list[str] = []
+        self.recognitions: dict[str, list[float]] = {}
+        self.hits: dict[str, int] = {}
+        self._started: dict[str, float] = {}
+
+    def on_node_recognition(
+        self,
+        context: Context,
+        noti_type: NotificationType,
+        detail: ContextEventSink.NodeRecognitionDetail,
+    ):
+        if noti_type == NotificationType.Starting:
+            self._started[detail.name] = time.perf_counter()
+            return
+        started = self._started.pop(detail.name, None)
+        if started is None:
+            return
+        self.recognitions.setdefault(detail.name, []).append(time.perf_counter() - started)
+        if noti_type == NotificationType.Succeeded:
+            self.hits[detail.name] = self.hits.get(detail.name, 0) + 1
+
+    def on_node_pipeline_node(
+        self,
+        context: Context,
+        noti_type: NotificationType,
+        detail: ContextEventSink.NodePipelineNodeDetail,
+    ):
+        if noti_type == NotificationType.Starting:
+            self.transitions.append(detail.name)
+
+    def report(self) -> dict:
+        stats = {}
+        for name, durations in self.recognitions.items():
+            durations = sorted(durations)
+            stats[name] = {
+                "calls": len(durations),
+                "hits": self.hits.get(name, 0),
+                "mean_ms": sum(durations) / len(durations) * 1000,
+                "p95_ms": durations[max(0, round(0.95 * len(durations)) - 1)] * 1000,
+                "max_ms": durations[-1] * 1000,
+            }
+        return {"transitions": self.transitions, "recognitions": stats}
+
+
+def register_custom(resource: Resource):
+    """按 agent/custom.json 注册自定义动作与识别"""
+    with open(agent_dir / "custom.json", "r", encoding="utf-8") as f:
+        custom = json.load(f)
+
+    for name, entry in custom.items():
+        file_path = Path(entry["file_path"].replace("{agent_path}", str(agent_dir)))
+        module_name = ".".join(file_path.relative_to(agent_dir).with_suffix("").parts)
+        cls = getattr(importlib.import_module(module_name), entry["class"])
+        if entry.get("type") == "recognition":
+            resource.register_custom_recognition(name, cls())
+        else:
+            resource.register_custom_action(name, cls())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="使用录制画面离线运行流水线任务")
+    parser.add_argument("frames", help="截图目录或会话录制目录")
+    parser.add_argument("entry", help="任务入口节点")
+    parser.add_argument("--script", help="回放脚本 JSON")
+    parser.add_argument(
+        "--resource",
+        nargs="+",
+        default=[str(working_dir / "assets" / "resource" / "base")],
+        help="资源目录，可多个",
+    )
+    parser.add_argument("--override", help="pipeline_override JSON 文件")
+    parser.add_argument("--output", help="回放报告输出路径")
+
+    args = parser.parse_args()
+
+    resource = Resource()
+    for path in args.resource:
+        if not resource.post_bundle(path).wait().succeeded:
+            print(f"错误: 加载资源失败: {path}")
+            sys.exit(1)
+    register_custom(resource)
+
+    controller = ReplayController.from_path(args.frames, args.script)
+    controller.post_connection().wait()
+
+    tasker = Tasker()
+    tasker.bind(resource, controller)
+    if not tasker.inited:
+        print("错误: Tasker 初始化失败")
+        sys.exit(1)
+
+    sink = ReplayTimingSink()
+    tasker.add_context_sink(sink)
+
+    pipeline_override = {}
+    if args.override:
+        with open(args.override, "r", encoding="utf-8") as f:
+            pipeline_override = json.load(f)
+
+    print(f"回放 {len(controller.source)} 帧，任务入口: {args.entry}")
+    start = time.perf_counter()
+    job = tasker.post_task(args.entry, pipeline_override).wait()
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "entry": args.entry,
+        "succeeded": job.succeeded,
+        "seconds": elapsed,
+        "final_frame": controller.current,
+        "inputs": controller.events,
+        **sink.report(),
+    }
+
+    print(f"任务{'成功' if job.succeeded else '失败'}，耗时 {elapsed:.2f}s，结束于第 {controller.current} 帧")
+    print(f"节点跳转: {' -> '.join(report['transitions'])}")
+    for name, stats in sorted(
+        report["recognitions"].items(), key=lambda item: -item[1]["mean_ms"] * item[1]["calls"]
+    ):
+        print(
+            f"  {name}: {stats['calls']} 次，命中 {stats['hits']}，"
+            f"平均 {stats['mean_ms']:.1f} ms，p95 {stats['p95_ms']:.1f} ms，最大 {stats['max_ms']:.1f} ms"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+        print(f"报告已写入 {args.output}")
+
+    if not job.succeeded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()